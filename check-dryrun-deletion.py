@@ -19,63 +19,169 @@ Keep this text in the file but do not include it in the help section.
 from __future__ import annotations
 
 import argparse
+import ctypes
+import mmap
+import os
+import re
 import sys
+import threading
 from pathlib import Path
-from typing import Iterable, Optional, Tuple
+from typing import Callable, Iterator, Optional, Tuple
 
 SMALL_COMPARE_THRESHOLD = 512 * 1024
 SAMPLE_BLOCK_BYTES = 32 * 1024
 SAMPLE_SPOTS = 10
 FULL_COMPARE_CHUNK = 256 * 1024
+MMAP_COMPARE_CHUNK = 4 * 1024 * 1024
+
+# pread-style reads: one syscall per sample and no seek; not available on Windows.
+HAVE_PREADV = hasattr(os, "preadv")
+
+# "[DRY RUN] [Would move] <from> -> <to>", split on the first "->"; matched on raw bytes.
+DRY_RUN_PREFIX = re.compile(rb"\s*\[DRY RUN\]")
+DRY_RUN_LINE = re.compile(rb"\s*\[DRY RUN\]\s*(?:Would move\s*)?(.*?)\s*->\s*(.*?)\s*$")
 
 
 def eprint(message: str) -> None:
     print(message, file=sys.stderr)
 
 
-def parse_line(line: str) -> Tuple[Optional[Tuple[Path, Path]], Optional[str]]:
-    stripped = line.strip()
-    if not stripped:
-        return None, None
-    if not stripped.startswith("[DRY RUN]"):
-        return None, None
+def decode_path(raw: bytes) -> Path:
+    return Path(raw.decode("utf-8", errors="replace"))
 
-    payload = stripped[len("[DRY RUN]") :].strip()
-    if payload.startswith("Would move"):
-        payload = payload[len("Would move") :].strip()
 
-    left, sep, right = payload.partition("->")
-    if not sep:
-        return None, "missing '->' separator"
+def parse_line(line: bytes) -> Tuple[Optional[Tuple[Path, Path]], Optional[str]]:
+    match = DRY_RUN_LINE.match(line)
+    if match is None:
+        if DRY_RUN_PREFIX.match(line):
+            return None, "missing '->' separator"
+        return None, None
 
-    from_path = left.strip()
-    to_path = right.strip()
+    from_path, to_path = match.groups()
     if not from_path or not to_path:
         return None, "missing source or target path"
 
-    return (Path(from_path), Path(to_path)), None
+    return (decode_path(from_path), decode_path(to_path)), None
 
 
-def files_same_size(path_a: Path, path_b: Path) -> Tuple[bool, int, int]:
+def stat_or_warn(path: Path) -> Optional[os.stat_result]:
     try:
-        size_a = path_a.stat().st_size
+        return os.stat(path)
     except OSError as exc:
-        eprint(f"[warn] Could not stat {path_a}: {exc}")
-        return False, -1, -1
+        eprint(f"[warn] Could not stat {path}: {exc}")
+        return None
+
+
+def open_readonly_map(handle) -> Optional[mmap.mmap]:
     try:
-        size_b = path_b.stat().st_size
-    except OSError as exc:
-        eprint(f"[warn] Could not stat {path_b}: {exc}")
-        return False, size_a, -1
-    return size_a == size_b, size_a, size_b
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # Empty files and some filesystems cannot be mapped.
+        return None
+    if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+        try:
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        except OSError:
+            pass
+    return mapped
+
+
+def mapped_equal(fa, fb) -> Optional[bool]:
+    """Compare two open files via mmap; returns None when mapping is not possible."""
+    map_a = open_readonly_map(fa)
+    if map_a is None:
+        return None
+    map_b = open_readonly_map(fb)
+    if map_b is None:
+        map_a.close()
+        return None
+    try:
+        if len(map_a) != len(map_b):
+            return False
+        # Slicing an mmap copies into bytes, whose equality is a plain memcmp;
+        # comparing memoryview slices would go element by element instead.
+        for offset in range(0, len(map_a), MMAP_COMPARE_CHUNK):
+            end = offset + MMAP_COMPARE_CHUNK
+            if map_a[offset:end] != map_b[offset:end]:
+                return False
+        return True
+    finally:
+        map_a.close()
+        map_b.close()
+
+
+def load_memcmp() -> Optional[Callable[..., int]]:
+    """Return libc's memcmp via ctypes, or None when it cannot be loaded."""
+    try:
+        libc = ctypes.CDLL(None) if os.name == "posix" else ctypes.cdll.msvcrt
+        memcmp = libc.memcmp
+    except (OSError, AttributeError):
+        return None
+    memcmp.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
+    memcmp.restype = ctypes.c_int
+    return memcmp
+
+
+MEMCMP = load_memcmp()
+_compare_buffers = threading.local()
+
+
+def small_compare_buffers() -> Tuple[bytearray, bytearray, object, object]:
+    """Per-thread buffers (and ctypes views on them) sized for the small-file compare."""
+    buffers = getattr(_compare_buffers, "value", None)
+    if buffers is None:
+        buf_a = bytearray(SMALL_COMPARE_THRESHOLD)
+        buf_b = bytearray(SMALL_COMPARE_THRESHOLD)
+        c_array = ctypes.c_char * SMALL_COMPARE_THRESHOLD
+        buffers = (buf_a, buf_b, c_array.from_buffer(buf_a), c_array.from_buffer(buf_b))
+        _compare_buffers.value = buffers
+    return buffers
+
+
+def read_full(fp, buffer: bytearray) -> int:
+    """Fill buffer from fp until it is full or EOF; returns the byte count read."""
+    total = 0
+    with memoryview(buffer) as view:
+        while total < len(buffer):
+            count = fp.readinto(view[total:])
+            if not count:
+                break
+            total += count
+    return total
+
+
+def small_files_equal(fa, fb) -> bool:
+    buf_a, buf_b, c_a, c_b = small_compare_buffers()
+    read_a = read_full(fa, buf_a)
+    read_b = read_full(fb, buf_b)
+    if read_a != read_b:
+        return False
+    if read_a == len(buf_a) and (fa.read(1) or fb.read(1)):
+        # Grew past the small-file limit since it was stat'ed; let the caller stream it.
+        raise ValueError("file larger than small compare buffer")
+    if MEMCMP is not None:
+        return MEMCMP(c_a, c_b, read_a) == 0
+    return buf_a[:read_a] == buf_b[:read_a]
 
 
-def files_binary_equal(path_a: Path, path_b: Path, chunk_size: int = FULL_COMPARE_CHUNK) -> bool:
+def files_binary_equal(path_a: Path, path_b: Path, size: int) -> bool:
     try:
         with path_a.open("rb", buffering=0) as fa, path_b.open("rb", buffering=0) as fb:
+            if size <= SMALL_COMPARE_THRESHOLD:
+                # One readinto per file into reused buffers, then a single memcmp.
+                try:
+                    return small_files_equal(fa, fb)
+                except ValueError:
+                    fa.seek(0)
+                    fb.seek(0)
+            mapped = mapped_equal(fa, fb)
+            if mapped is not None:
+                return mapped
+            advise(fa, 0, 0, "POSIX_FADV_SEQUENTIAL")
+            advise(fb, 0, 0, "POSIX_FADV_SEQUENTIAL")
             while True:
-                chunk_a = fa.read(chunk_size)
-                chunk_b = fb.read(chunk_size)
+                chunk_a = fa.read(FULL_COMPARE_CHUNK)
+                chunk_b = fb.read(FULL_COMPARE_CHUNK)
                 if chunk_a != chunk_b:
                     return False
                 if not chunk_a:
@@ -85,35 +191,53 @@ def files_binary_equal(path_a: Path, path_b: Path, chunk_size: int = FULL_COMPAR
         return False
 
 
-def read_segment(fp, offset: int, length: int) -> bytes:
-    fp.seek(max(offset, 0))
-    return fp.read(max(length, 0))
-
+def advise(fp, offset: int, length: int, advice_name: str) -> None:
+    """Pass an access-pattern hint to the kernel when posix_fadvise is available."""
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fp.fileno(), offset, length, advice)
+    except OSError:
+        pass
 
-def sampled_offsets(size: int, block_size: int, spots: int) -> Iterable[int]:
-    max_offset = max(size - block_size, 0)
-    seen = set()
 
-    def add(offset: int) -> None:
-        bounded = min(max(offset, 0), max_offset)
-        if bounded in seen:
-            return
-        seen.add(bounded)
-        offsets.append(bounded)
+def read_segment_into(fp, buffer: bytearray, offset: int, length: int) -> int:
+    """Read up to length bytes at offset into buffer; returns the byte count read."""
+    with memoryview(buffer) as view, view[: max(length, 0)] as target:
+        if HAVE_PREADV:
+            return os.preadv(fp.fileno(), [target], max(offset, 0))
+        fp.seek(max(offset, 0))
+        return fp.readinto(target) or 0
 
-    offsets: list[int] = []
-    add(0)
 
-    middle = max((size // 2) - (block_size // 2), 0)
-    add(middle)
+def buffers_equal(buf_a: bytearray, buf_b: bytearray, length: int) -> bool:
+    if length == len(buf_a):
+        return buf_a == buf_b
+    return buf_a[:length] == buf_b[:length]
 
-    if spots > 0 and max_offset > 0:
-        for i in range(1, spots + 1):
-            offset = int(round(i * max_offset / (spots + 1)))
-            add(offset)
 
-    add(max_offset)
-    return offsets
+def sampled_offsets(size: int, block_size: int, spots: int) -> Iterator[int]:
+    """
+    Yield block offsets in ascending order without repeats: the start, `spots` offsets spread
+    evenly across the file, the middle block and the last block.
+    """
+    max_offset = max(size - block_size, 0)
+    middle = min(max((size // 2) - (block_size // 2), 0), max_offset)
+    steps = spots + 1 if spots > 0 and max_offset > 0 else 1
+    last = -1
+    middle_pending = True
+    for i in range(steps + 1):
+        # round() as in the original sampler (half to even), so the same bytes are sampled.
+        offset = int(round(i * max_offset / steps))
+        if middle_pending and middle <= offset:
+            middle_pending = False
+            if middle != last:
+                yield middle
+                last = middle
+        if offset != last:
+            yield offset
+            last = offset
 
 
 def files_sampled_equal(path_a: Path, path_b: Path, size: int) -> bool:
@@ -121,11 +245,20 @@ def files_sampled_equal(path_a: Path, path_b: Path, size: int) -> bool:
         return False
     try:
         with path_a.open("rb", buffering=0) as fa, path_b.open("rb", buffering=0) as fb:
-            for offset in sampled_offsets(size, SAMPLE_BLOCK_BYTES, SAMPLE_SPOTS):
+            offsets = tuple(sampled_offsets(size, SAMPLE_BLOCK_BYTES, SAMPLE_SPOTS))
+            # Queue all probes up front so the scattered reads are fetched in parallel.
+            for offset in offsets:
+                advise(fa, offset, SAMPLE_BLOCK_BYTES, "POSIX_FADV_WILLNEED")
+                advise(fb, offset, SAMPLE_BLOCK_BYTES, "POSIX_FADV_WILLNEED")
+            buf_a = bytearray(SAMPLE_BLOCK_BYTES)
+            buf_b = bytearray(SAMPLE_BLOCK_BYTES)
+            for offset in offsets:
                 length = min(SAMPLE_BLOCK_BYTES, max(size - offset, 0))
                 if length <= 0:
                     continue
-                if read_segment(fa, offset, length) != read_segment(fb, offset, length):
+                read_a = read_segment_into(fa, buf_a, offset, length)
+                read_b = read_segment_into(fb, buf_b, offset, length)
+                if read_a != read_b or not buffers_equal(buf_a, buf_b, read_a):
                     return False
             return True
     except OSError as exc:
@@ -133,9 +266,18 @@ def files_sampled_equal(path_a: Path, path_b: Path, size: int) -> bool:
         return False
 
 
-def files_equivalent(path_a: Path, path_b: Path, size: int) -> Tuple[bool, str]:
+def files_equivalent(
+    path_a: Path, path_b: Path, stat_a: os.stat_result, stat_b: os.stat_result
+) -> Tuple[bool, str]:
+    # Hardlinks to one inode, or two empty files, are equal without reading anything.
+    if os.path.samestat(stat_a, stat_b):
+        return True, "match"
+    size = stat_a.st_size
+    if size == 0 and stat_b.st_size == 0:
+        return True, "match"
+
     if size <= SMALL_COMPARE_THRESHOLD:
-        if files_binary_equal(path_a, path_b, chunk_size=max(1, size)):
+        if files_binary_equal(path_a, path_b, size):
             return True, "match"
         return False, "content differs"
 
@@ -150,11 +292,15 @@ def compare_paths(path_a: Path, path_b: Path) -> Tuple[bool, str]:
     if not path_b.exists():
         return False, "missing target"
 
-    sizes_equal, size_a, size_b = files_same_size(path_a, path_b)
-    if not sizes_equal:
-        return False, f"size differs ({size_a} vs {size_b})"
+    stat_a = stat_or_warn(path_a)
+    stat_b = stat_or_warn(path_b) if stat_a is not None else None
+    if stat_a is None or stat_b is None:
+        size_a = stat_a.st_size if stat_a is not None else -1
+        return False, f"size differs ({size_a} vs -1)"
+    if stat_a.st_size != stat_b.st_size:
+        return False, f"size differs ({stat_a.st_size} vs {stat_b.st_size})"
 
-    return files_equivalent(path_a, path_b, size_a)
+    return files_equivalent(path_a, path_b, stat_a, stat_b)
 
 
 def parse_args() -> argparse.Namespace:
@@ -188,7 +334,7 @@ def main() -> int:
 
     dryrun_path = Path(args.dryrun_file)
     try:
-        handle = dryrun_path.open("r", encoding="utf-8", errors="replace")
+        handle = dryrun_path.open("rb")
     except OSError as exc:
         eprint(f"[error] Unable to read {dryrun_path}: {exc}")
         return 2
@@ -34,14 +34,26 @@ Options:
   --naive         Skip binary comparison; requires matching size only.
   --ignore-pure-zero  Skip deleting files that are entirely zero bytes.
   --print-delete  Print full paths of files that would be deleted (one per line).
+  -j, --jobs      Number of threads comparing candidate files (default: 4 per CPU, max 32).
+  -p, --processes Worker processes for the sampled compare of files > 512 KB (default: 0, off).
+  --resolve-symlinks  Resolve symlinks in manifest paths instead of only normalizing them.
+  --cache         Keep parsed hashes.txt entries in .hashes.cache.json next to each hashes.txt;
+                  reused while hashes.txt keeps the same mtime and size and the directory
+                  has not moved.
 """
 from __future__ import annotations
 
 import argparse
+import ctypes
+import mmap
+import json
+import os
 import sys
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
 
 MIN_DELETE_BYTES = 1024
 SMALL_COMPARE_THRESHOLD = 512 * 1024
@@ -49,14 +61,32 @@ HEAD_COMPARE_BYTES = 256 * 1024
 MIDDLE_COMPARE_BYTES = 128 * 1024
 TAIL_COMPARE_BYTES = 128 * 1024
 FULL_COMPARE_CHUNK = 256 * 1024
+MMAP_COMPARE_CHUNK = 4 * 1024 * 1024
+# Read into one reused buffer per thread; with up to 32 jobs this bounds the zero check to 256 MiB.
 ZERO_CHECK_CHUNK = 8 * 1024 * 1024
+# Calloc'd, so untouched pages stay shared with the kernel zero page.
+ZERO_BLOCK = bytes(ZERO_CHECK_CHUNK)
+DEFAULT_JOBS = min(32, 4 * (os.cpu_count() or 1))
+CACHE_FILE_NAME = ".hashes.cache.json"
+CACHE_VERSION = 2
+
+# pread-style reads: one syscall per sample and no seek; not available on Windows.
+HAVE_PREADV = hasattr(os, "preadv")
+
+# Hex digests are stored as raw bytes (half the size, cheaper to hash); any other
+# digest text is kept as str, which can never compare equal to a bytes key.
+DigestKey = Union[bytes, str]
+
 
 @dataclass
 class HashEntry:
-    digest: str
+    digest: DigestKey
     path: Path
     base_index: int
     line_no: int
+    # Filled in the first time this entry is stat'ed as a keeper; keepers are never deleted.
+    stat: Optional[os.stat_result] = None
+    stat_failed: bool = False
 
 
 @dataclass
@@ -75,6 +105,13 @@ def eprint(message: str) -> None:
     print(message, file=sys.stderr)
 
 
+def digest_key(digest: str) -> DigestKey:
+    try:
+        return bytes.fromhex(digest)
+    except ValueError:
+        return digest
+
+
 def normalize_relative_path(rel_path: str) -> Path:
     """
     Normalize a relative path string to handle both '/' and '\\' separators
@@ -84,24 +121,116 @@ def normalize_relative_path(rel_path: str) -> Path:
     return Path(cleaned)
 
 
-def files_same_size(path_a: Path, path_b: Path) -> tuple[bool, int, int]:
+def open_readonly_map(handle) -> Optional[mmap.mmap]:
     try:
-        size_a = path_a.stat().st_size
-    except OSError:
-        return False, -1, -1
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # Empty files and some filesystems cannot be mapped.
+        return None
+    if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+        try:
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        except OSError:
+            pass
+    return mapped
+
+
+def mapped_equal(fa, fb) -> Optional[bool]:
+    """Compare two open files via mmap; returns None when mapping is not possible."""
+    map_a = open_readonly_map(fa)
+    if map_a is None:
+        return None
+    map_b = open_readonly_map(fb)
+    if map_b is None:
+        map_a.close()
+        return None
     try:
-        size_b = path_b.stat().st_size
-    except OSError:
-        return False, size_a, -1
-    return size_a == size_b, size_a, size_b
+        if len(map_a) != len(map_b):
+            return False
+        # Slicing an mmap copies into bytes, whose equality is a plain memcmp;
+        # comparing memoryview slices would go element by element instead.
+        for offset in range(0, len(map_a), MMAP_COMPARE_CHUNK):
+            end = offset + MMAP_COMPARE_CHUNK
+            if map_a[offset:end] != map_b[offset:end]:
+                return False
+        return True
+    finally:
+        map_a.close()
+        map_b.close()
+
+
+def load_memcmp() -> Optional[Callable[..., int]]:
+    """Return libc's memcmp via ctypes, or None when it cannot be loaded."""
+    try:
+        libc = ctypes.CDLL(None) if os.name == "posix" else ctypes.cdll.msvcrt
+        memcmp = libc.memcmp
+    except (OSError, AttributeError):
+        return None
+    memcmp.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
+    memcmp.restype = ctypes.c_int
+    return memcmp
+
+
+MEMCMP = load_memcmp()
+_compare_buffers = threading.local()
+
+
+def small_compare_buffers() -> Tuple[bytearray, bytearray, object, object]:
+    """Per-thread buffers (and ctypes views on them) sized for the small-file compare."""
+    buffers = getattr(_compare_buffers, "value", None)
+    if buffers is None:
+        buf_a = bytearray(SMALL_COMPARE_THRESHOLD)
+        buf_b = bytearray(SMALL_COMPARE_THRESHOLD)
+        c_array = ctypes.c_char * SMALL_COMPARE_THRESHOLD
+        buffers = (buf_a, buf_b, c_array.from_buffer(buf_a), c_array.from_buffer(buf_b))
+        _compare_buffers.value = buffers
+    return buffers
+
+
+def read_full(fp, buffer: bytearray) -> int:
+    """Fill buffer from fp until it is full or EOF; returns the byte count read."""
+    total = 0
+    with memoryview(buffer) as view:
+        while total < len(buffer):
+            count = fp.readinto(view[total:])
+            if not count:
+                break
+            total += count
+    return total
+
+
+def small_files_equal(fa, fb) -> bool:
+    buf_a, buf_b, c_a, c_b = small_compare_buffers()
+    read_a = read_full(fa, buf_a)
+    read_b = read_full(fb, buf_b)
+    if read_a != read_b:
+        return False
+    if read_a == len(buf_a) and (fa.read(1) or fb.read(1)):
+        # Grew past the small-file limit since it was stat'ed; let the caller stream it.
+        raise ValueError("file larger than small compare buffer")
+    if MEMCMP is not None:
+        return MEMCMP(c_a, c_b, read_a) == 0
+    return buf_a[:read_a] == buf_b[:read_a]
 
 
-def files_binary_equal(path_a: Path, path_b: Path, chunk_size: int = FULL_COMPARE_CHUNK) -> bool:
+def files_binary_equal(path_a: Path, path_b: Path, size: int) -> bool:
     try:
         with path_a.open("rb", buffering=0) as fa, path_b.open("rb", buffering=0) as fb:
+            if size <= SMALL_COMPARE_THRESHOLD:
+                # One readinto per file into reused buffers, then a single memcmp.
+                try:
+                    return small_files_equal(fa, fb)
+                except ValueError:
+                    fa.seek(0)
+                    fb.seek(0)
+            mapped = mapped_equal(fa, fb)
+            if mapped is not None:
+                return mapped
+            advise(fa, 0, 0, "POSIX_FADV_SEQUENTIAL")
+            advise(fb, 0, 0, "POSIX_FADV_SEQUENTIAL")
             while True:
-                chunk_a = fa.read(chunk_size)
-                chunk_b = fb.read(chunk_size)
+                chunk_a = fa.read(FULL_COMPARE_CHUNK)
+                chunk_b = fb.read(FULL_COMPARE_CHUNK)
                 if chunk_a != chunk_b:
                     return False
                 if not chunk_a:
@@ -111,9 +240,34 @@ def files_binary_equal(path_a: Path, path_b: Path, chunk_size: int = FULL_COMPAR
         return False
 
 
-def read_segment(fp, offset: int, length: int) -> bytes:
-    fp.seek(max(offset, 0))
-    return fp.read(max(length, 0))
+def advise(fp, offset: int, length: int, advice_name: str) -> None:
+    """Pass an access-pattern hint to the kernel when posix_fadvise is available."""
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fp.fileno(), offset, length, advice)
+    except OSError:
+        pass
+
+
+def read_segment_into(fp, buffer: bytearray, offset: int, length: int) -> int:
+    """Read up to length bytes at offset into buffer; returns the byte count read."""
+    with memoryview(buffer) as view, view[: max(length, 0)] as target:
+        if HAVE_PREADV:
+            return os.preadv(fp.fileno(), [target], max(offset, 0))
+        fp.seek(max(offset, 0))
+        return fp.readinto(target) or 0
+
+
+def buffers_equal(buf_a: bytearray, buf_b: bytearray, length: int) -> bool:
+    """Compare the first length bytes of two equal-sized buffers without slicing copies."""
+    if length == len(buf_a):
+        return buf_a == buf_b
+    if MEMCMP is not None:
+        c_array = ctypes.c_char * len(buf_a)
+        return MEMCMP(c_array.from_buffer(buf_a), c_array.from_buffer(buf_b), length) == 0
+    return buf_a[:length] == buf_b[:length]
 
 
 def files_sampled_equal(path_a: Path, path_b: Path, size: int) -> bool:
@@ -129,8 +283,16 @@ def files_sampled_equal(path_a: Path, path_b: Path, size: int) -> bool:
                 ),
                 (max(size - TAIL_COMPARE_BYTES, 0), min(TAIL_COMPARE_BYTES, size)),
             ]
+            # Queue all probes up front so the scattered reads are fetched in parallel.
             for offset, length in segments:
-                if read_segment(fa, offset, length) != read_segment(fb, offset, length):
+                advise(fa, offset, length, "POSIX_FADV_WILLNEED")
+                advise(fb, offset, length, "POSIX_FADV_WILLNEED")
+            buf_a = bytearray(HEAD_COMPARE_BYTES)
+            buf_b = bytearray(HEAD_COMPARE_BYTES)
+            for offset, length in segments:
+                read_a = read_segment_into(fa, buf_a, offset, length)
+                read_b = read_segment_into(fb, buf_b, offset, length)
+                if read_a != read_b or not buffers_equal(buf_a, buf_b, read_a):
                     return False
             return True
     except OSError as exc:
@@ -139,31 +301,72 @@ def files_sampled_equal(path_a: Path, path_b: Path, size: int) -> bool:
 
 
 def files_equivalent(
-    path_a: Path, path_b: Path, size: int, naive: bool
+    path_a: Path,
+    path_b: Path,
+    stat_a: os.stat_result,
+    stat_b: os.stat_result,
+    naive: bool,
+    process_pool: Optional[Executor] = None,
 ) -> bool:
     if naive:
         return True
+    # Hardlinks to one inode, or two empty files, are equal without reading anything.
+    if os.path.samestat(stat_a, stat_b):
+        return True
+    size = stat_a.st_size
+    if size == 0 and stat_b.st_size == 0:
+        return True
     if size <= SMALL_COMPARE_THRESHOLD:
-        return files_binary_equal(path_a, path_b, chunk_size=max(size, 1))
+        return files_binary_equal(path_a, path_b, size)
+    if process_pool is not None:
+        # Large-file samples go to worker processes so compares use every core.
+        return process_pool.submit(files_sampled_equal, path_a, path_b, size).result()
     return files_sampled_equal(path_a, path_b, size)
 
 
+_zero_check_buffer = threading.local()
+
+
+def zero_check_buffer() -> Tuple[bytearray, object]:
+    """Per-thread read buffer (and a ctypes view on it) for the zero check."""
+    buffer = getattr(_zero_check_buffer, "value", None)
+    if buffer is None:
+        data = bytearray(ZERO_CHECK_CHUNK)
+        buffer = (data, (ctypes.c_char * ZERO_CHECK_CHUNK).from_buffer(data))
+        _zero_check_buffer.value = buffer
+    return buffer
+
+
+def buffer_is_zero(buffer: bytearray, c_buffer: object, length: int) -> bool:
+    """True if the first length bytes of buffer are zero, compared against ZERO_BLOCK."""
+    if MEMCMP is not None:
+        return MEMCMP(c_buffer, ZERO_BLOCK, length) == 0
+    # bytes equality is a memcmp that stops at the first non-zero byte, unlike count(0).
+    if length == len(buffer):
+        return buffer == ZERO_BLOCK
+    return buffer[:length] == ZERO_BLOCK[:length]
+
+
 def file_is_pure_zero(path: Path, size: int) -> bool:
     if size <= 0:
         return True
     head_size = min(size, HEAD_COMPARE_BYTES)
+    buffer, c_buffer = zero_check_buffer()
     try:
-        with path.open("rb", buffering=0) as handle:
-            head = handle.read(head_size)
-            if head.count(0) != len(head):
+        with open(path, "rb", buffering=0) as handle:
+            # The whole file is read front to back; let the kernel widen its readahead.
+            advise(handle, 0, 0, "POSIX_FADV_SEQUENTIAL")
+            with memoryview(buffer) as view, view[:head_size] as head:
+                count = read_full(handle, head)
+            if not buffer_is_zero(buffer, c_buffer, count):
                 return False
             if size <= head_size:
                 return True
             while True:
-                chunk = handle.read(ZERO_CHECK_CHUNK)
-                if not chunk:
+                count = read_full(handle, buffer)
+                if not count:
                     return True
-                if chunk.count(0) != len(chunk):
+                if not buffer_is_zero(buffer, c_buffer, count):
                     return False
     except OSError as exc:
         eprint(f"[warn] Failed to read {path} for zero check: {exc}")
@@ -216,6 +419,30 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Print full paths of files that would be deleted (one per line).",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Number of threads comparing candidate files (default: {DEFAULT_JOBS}).",
+    )
+    parser.add_argument(
+        "-p",
+        "--processes",
+        type=int,
+        default=0,
+        help="Worker processes for sampled compares of large files (default: 0, compare in threads).",
+    )
+    parser.add_argument(
+        "--resolve-symlinks",
+        action="store_true",
+        help="Resolve symlinks in manifest paths (slower; paths are only normalized by default).",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help=f"Keep parsed hashes.txt entries in {CACHE_FILE_NAME} to speed up repeated runs.",
+    )
     return parser.parse_args()
 
 
@@ -234,9 +461,9 @@ def validate_paths(raw_paths: List[str]) -> List[Path]:
     return base_paths
 
 
-def iter_hash_entries(base_path: Path, base_index: int) -> Iterable[HashEntry]:
+def parse_hash_file(base_path: Path, resolve_symlinks: bool) -> Iterable[Tuple[str, Path, int]]:
     hash_file = base_path / "hashes.txt"
-    with hash_file.open("r", encoding="utf-8") as handle:
+    with open(hash_file, "r", encoding="utf-8") as handle:
         for line_no, line in enumerate(handle, 1):
             stripped = line.strip()
             if not stripped or stripped.startswith("#"):
@@ -253,8 +480,185 @@ def iter_hash_entries(base_path: Path, base_index: int) -> Iterable[HashEntry]:
             if normalized_rel.is_absolute():
                 eprint(f"[warn] {hash_file}:{line_no}: relative path is absolute: {rel_path}")
                 continue
-            file_path = (base_path / normalized_rel).resolve()
-            yield HashEntry(digest=digest, path=file_path, base_index=base_index, line_no=line_no)
+            if resolve_symlinks:
+                file_path = (base_path / normalized_rel).resolve()
+            else:
+                # Pure string normalisation; resolve() would stat every path component.
+                file_path = Path(os.path.normpath(os.path.join(base_path, normalized_rel)))
+            yield digest, file_path, line_no
+
+
+def hash_file_signature(base_path: Path, resolve_symlinks: bool) -> Optional[List]:
+    """
+    Identify the hashes.txt a cache was built from. The resolved base path is part
+    of it, so a copied or moved tree never reuses entries pointing at the original.
+    """
+    try:
+        stat_info = os.stat(base_path / "hashes.txt")
+    except OSError:
+        return None
+    # A list, as that is what the signature reads back as from JSON.
+    return [CACHE_VERSION, str(base_path), stat_info.st_mtime_ns, stat_info.st_size, resolve_symlinks]
+
+
+def load_cached_rows(base_path: Path, signature: List) -> Optional[List[Tuple[str, str, int]]]:
+    """Cached (digest, path relative to base_path, line) rows, or None if stale or absent."""
+    cache_path = base_path / CACHE_FILE_NAME
+    try:
+        with open(cache_path, "r", encoding="utf-8", errors="surrogateescape") as handle:
+            cached = json.load(handle)
+        cached_signature, rows = cached["signature"], cached["rows"]
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        eprint(f"[warn] Ignoring unreadable cache {cache_path}: {exc}")
+        return None
+    if cached_signature != signature:
+        return None
+    return rows
+
+
+def store_cached_rows(base_path: Path, signature: List, rows: List[Tuple[str, str, int]]) -> None:
+    cache_path = base_path / CACHE_FILE_NAME
+    temp_path = cache_path.with_name(f"{CACHE_FILE_NAME}.tmp")
+    try:
+        with open(temp_path, "w", encoding="utf-8", errors="surrogateescape") as handle:
+            json.dump({"signature": signature, "rows": rows}, handle, separators=(",", ":"))
+        os.replace(temp_path, cache_path)
+    except OSError as exc:
+        eprint(f"[warn] Failed to write cache {cache_path}: {exc}")
+
+
+def iter_hash_entries(
+    base_path: Path, base_index: int, use_cache: bool = False, resolve_symlinks: bool = False
+) -> Iterable[HashEntry]:
+    """
+    Yield the entries of base_path/hashes.txt. With use_cache the parsed entries
+    are kept as JSON next to hashes.txt, with paths relative to base_path; they are
+    reused while hashes.txt keeps its mtime and size and base_path is unchanged.
+    """
+    signature = hash_file_signature(base_path, resolve_symlinks) if use_cache else None
+    if signature is not None:
+        rows = load_cached_rows(base_path, signature)
+        if rows is not None:
+            for digest, rel_str, line_no in rows:
+                file_path = Path(os.path.normpath(os.path.join(base_path, rel_str)))
+                yield HashEntry(
+                    digest=digest_key(digest), path=file_path, base_index=base_index, line_no=line_no
+                )
+            return
+
+    parsed: List[Tuple[str, str, int]] = []
+    for digest, file_path, line_no in parse_hash_file(base_path, resolve_symlinks):
+        if signature is not None:
+            parsed.append((digest, os.path.relpath(file_path, base_path), line_no))
+        yield HashEntry(digest=digest_key(digest), path=file_path, base_index=base_index, line_no=line_no)
+
+    if signature is not None:
+        store_cached_rows(base_path, signature, parsed)
+
+
+class DirectoryUnlinker:
+    """
+    Delete files relative to an open handle on their parent directory, so consecutive
+    deletes from one directory skip the kernel's full path walk. Falls back to plain
+    unlink where dir_fd is unsupported (e.g. Windows).
+    """
+
+    def __init__(self) -> None:
+        self._parent: Optional[str] = None
+        self._fd: Optional[int] = None
+        self._supported = os.unlink in os.supports_dir_fd and hasattr(os, "O_DIRECTORY")
+
+    def unlink(self, path: Path) -> None:
+        if not self._supported:
+            path.unlink()
+            return
+        parent, name = os.path.split(os.fspath(path))
+        if parent != self._parent:
+            self.close()
+            flags = os.O_DIRECTORY | getattr(os, "O_PATH", os.O_RDONLY)
+            self._fd = os.open(parent or ".", flags)
+            self._parent = parent
+        os.unlink(name, dir_fd=self._fd)
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = None
+        self._parent = None
+
+    def __enter__(self) -> "DirectoryUnlinker":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def check_candidate(
+    entry: HashEntry,
+    keeper: HashEntry,
+    min_delete_bytes: int,
+    naive: bool,
+    ignore_pure_zero: bool,
+    process_pool: Optional[Executor] = None,
+) -> Tuple[str, Optional[str]]:
+    """
+    Decide whether entry may be deleted in favour of keeper.
+    Returns (outcome, message); safe to run from worker threads as it only reads files.
+    """
+    if entry.path == keeper.path:
+        return "same", f"[info] Duplicate hash entry for same file skipped: {entry.path}"
+
+    # One os.stat per file answers existence and size; pathlib would stat twice.
+    try:
+        entry_stat = os.stat(entry.path)
+    except (FileNotFoundError, NotADirectoryError):
+        return "missing", f"[warn] File listed but missing: {entry.path}"
+    except OSError as exc:
+        return "stat_failed", f"[warn] Could not stat {entry.path}: {exc}"
+    keeper_stat = keeper.stat
+    if keeper_stat is None and not keeper.stat_failed:
+        try:
+            keeper_stat = keeper.stat = os.stat(keeper.path)
+        except OSError:
+            keeper.stat_failed = True
+    if keeper_stat is None:
+        return (
+            "keeper_missing",
+            f"[warn] Kept file missing ({keeper.path}); skipping delete of {entry.path}.",
+        )
+
+    # Without --resolve-symlinks two spellings of one path (e.g. via a symlinked
+    # directory) can reach here; never delete a file in favour of itself.
+    if os.path.samestat(entry_stat, keeper_stat) and os.path.realpath(entry.path) == os.path.realpath(
+        keeper.path
+    ):
+        return "same", f"[info] Duplicate hash entry for same file skipped: {entry.path}"
+
+    size_entry = entry_stat.st_size
+    if size_entry < min_delete_bytes:
+        return (
+            "small",
+            f"[info] Skipping {entry.path} ({size_entry} bytes) under {min_delete_bytes} bytes.",
+        )
+    if ignore_pure_zero and file_is_pure_zero(entry.path, size_entry):
+        return "zero", f"[info] Skipping all-zero file {entry.path}."
+
+    size_keeper = keeper_stat.st_size
+    if size_entry != size_keeper:
+        return (
+            "size_differs",
+            f"[info] Skip delete; size differs {entry.path} ({size_entry}) vs {keeper.path} ({size_keeper}).",
+        )
+
+    if not files_equivalent(entry.path, keeper.path, entry_stat, keeper_stat, naive, process_pool):
+        return (
+            "content_differs",
+            f"[info] Skip delete; content differs between {entry.path} and {keeper.path}.",
+        )
+
+    return "delete", None
 
 
 def deduplicate_paths(
@@ -265,67 +669,56 @@ def deduplicate_paths(
     naive: bool,
     ignore_pure_zero: bool,
     print_delete: bool,
+    jobs: int = DEFAULT_JOBS,
+    use_cache: bool = False,
+    processes: int = 0,
+    resolve_symlinks: bool = False,
 ) -> DedupStats:
-    kept: Dict[str, HashEntry] = {}
+    kept: Dict[DigestKey, HashEntry] = {}
+    candidates: List[Tuple[HashEntry, HashEntry]] = []
     stats = DedupStats(dry_run=dry_run)
 
+    listings: Dict[str, FrozenSet[str]] = {}
+
+    def path_exists(path: Path) -> bool:
+        # One scandir per directory instead of one stat per manifest entry.
+        parent, name = os.path.split(path)
+        names = listings.get(parent)
+        if names is None:
+            try:
+                with os.scandir(parent) as iterator:
+                    names = frozenset(item.name for item in iterator if not item.is_symlink())
+            except OSError:
+                names = frozenset()
+            listings[parent] = names
+        # Names not listed (symlinks, case-insensitive filesystems) still get a real stat.
+        return name in names or os.path.exists(path)
+
     def note_missing(entry: HashEntry) -> None:
         stats.missing_files += 1
         if verbose:
             eprint(f"[warn] File listed but missing: {entry.path}")
 
-    def try_delete(entry: HashEntry, keeper: HashEntry) -> None:
-        if entry.path == keeper.path:
+    def apply_decision(entry: HashEntry, keeper: HashEntry, outcome: str, message: Optional[str]) -> None:
+        if outcome == "same":
             if verbose:
-                eprint(f"[info] Duplicate hash entry for same file skipped: {entry.path}")
+                eprint(message)
             return
 
         stats.duplicates += 1
 
-        if not entry.path.exists():
-            note_missing(entry)
-            return
-        if not keeper.path.exists():
-            stats.missing_files += 1
-            if verbose:
-                eprint(
-                    f"[warn] Kept file missing ({keeper.path}); skipping delete of {entry.path}."
-                )
-            return
-
-        try:
-            size_entry = entry.path.stat().st_size
-        except OSError as exc:
+        if outcome in ("missing", "keeper_missing", "stat_failed"):
             stats.missing_files += 1
-            eprint(f"[warn] Could not stat {entry.path}: {exc}")
+            if verbose or outcome == "stat_failed":
+                eprint(message)
             return
-
-        if size_entry < min_delete_bytes:
+        if outcome == "small":
             stats.skipped_small += 1
-            if verbose:
-                eprint(
-                    f"[info] Skipping {entry.path} ({size_entry} bytes) under {min_delete_bytes} bytes."
-                )
-            return
-        if ignore_pure_zero and file_is_pure_zero(entry.path, size_entry):
+        elif outcome == "zero":
             stats.skipped_zero += 1
+        if outcome != "delete":
             if verbose:
-                eprint(f"[info] Skipping all-zero file {entry.path}.")
-            return
-
-        sizes_equal, size_a, size_b = files_same_size(entry.path, keeper.path)
-        if not sizes_equal:
-            if verbose:
-                eprint(
-                    f"[info] Skip delete; size differs {entry.path} ({size_a}) vs {keeper.path} ({size_b})."
-                )
-            return
-
-        if not files_equivalent(entry.path, keeper.path, size_a, naive):
-            if verbose:
-                eprint(
-                    f"[info] Skip delete; content differs between {entry.path} and {keeper.path}."
-                )
+                eprint(message)
             return
 
         if print_delete:
@@ -338,26 +731,26 @@ def deduplicate_paths(
             return
 
         try:
-            entry.path.unlink()
+            unlinker.unlink(entry.path)
             stats.deleted += 1
             print(f"{entry.path} -> {keeper.path}")
         except OSError as exc:
             eprint(f"[error] Failed to delete {entry.path}: {exc}")
 
     for base_index, base_path in enumerate(base_paths):
-        for entry in iter_hash_entries(base_path, base_index):
+        for entry in iter_hash_entries(base_path, base_index, use_cache, resolve_symlinks):
             stats.examined += 1
 
             kept_entry = kept.get(entry.digest)
             if kept_entry is None:
-                if not entry.path.exists():
+                if not path_exists(entry.path):
                     note_missing(entry)
                     continue
                 kept[entry.digest] = entry
                 continue
 
-            if not kept_entry.path.exists():
-                if not entry.path.exists():
+            if not path_exists(kept_entry.path):
+                if not path_exists(entry.path):
                     note_missing(entry)
                     continue
                 if verbose:
@@ -367,7 +760,7 @@ def deduplicate_paths(
                 kept[entry.digest] = entry
                 continue
 
-            if not entry.path.exists():
+            if not path_exists(entry.path):
                 note_missing(entry)
                 continue
 
@@ -380,7 +773,27 @@ def deduplicate_paths(
                 kept[entry.digest] = entry
                 continue
 
-            try_delete(entry, kept_entry)
+            candidates.append((entry, kept_entry))
+
+    # Comparisons are I/O bound and independent, so they run on a thread pool to keep
+    # the disk queue full. Deletions and output stay on this thread, in manifest order.
+    process_pool = ProcessPoolExecutor(max_workers=processes) if processes > 0 else None
+    if process_pool is not None:
+        # The first submit starts the workers (all of them under fork). Do it now, while
+        # this is the only thread, rather than from a comparison thread: forking a
+        # multi-threaded parent can deadlock the children on locks held mid-fork.
+        process_pool.submit(int).result()
+
+    def check(pair: Tuple[HashEntry, HashEntry]) -> Tuple[str, Optional[str]]:
+        return check_candidate(pair[0], pair[1], min_delete_bytes, naive, ignore_pure_zero, process_pool)
+
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as executor, DirectoryUnlinker() as unlinker:
+            for (entry, keeper), (outcome, message) in zip(candidates, executor.map(check, candidates)):
+                apply_decision(entry, keeper, outcome, message)
+    finally:
+        if process_pool is not None:
+            process_pool.shutdown()
 
     return stats
 
@@ -390,6 +803,12 @@ def main() -> int:
     if args.min_bytes < 0:
         eprint("Minimum delete bytes must be zero or greater.")
         return 1
+    if args.jobs < 1:
+        eprint("Jobs must be a positive integer.")
+        return 1
+    if args.processes < 0:
+        eprint("Processes must be zero or greater.")
+        return 1
     base_paths = validate_paths(args.paths)
     stats = deduplicate_paths(
         base_paths,
@@ -399,6 +818,10 @@ def main() -> int:
         args.naive,
         args.ignore_pure_zero,
         args.print_delete,
+        args.jobs,
+        args.cache,
+        args.processes,
+        args.resolve_symlinks,
     )
 
     if args.verbose:
@@ -18,36 +18,75 @@ Keep this text in the file but do not include it in the help section.
 from __future__ import annotations
 
 import argparse
+import os
+import re
 import sys
 from pathlib import Path
 from typing import Optional, Tuple
 
+# "[DRY RUN] [Would move] <from> -> <to>", split on the last "->"; matched on raw bytes.
+DRY_RUN_PREFIX = re.compile(rb"\s*\[DRY RUN\]")
+DRY_RUN_LINE = re.compile(rb"\s*\[DRY RUN\]\s*(?:Would move\s*)?(.*)->\s*(.*?)\s*$")
+
 
 def eprint(message: str) -> None:
     print(message, file=sys.stderr)
 
 
-def parse_line(line: str) -> Tuple[Optional[Tuple[Path, Path]], Optional[str]]:
-    stripped = line.strip()
-    if not stripped:
-        return None, None
-    if not stripped.startswith("[DRY RUN]"):
-        return None, None
+def decode_path(raw: bytes) -> Path:
+    return Path(raw.decode("utf-8", errors="replace"))
 
-    payload = stripped[len("[DRY RUN]") :].strip()
-    if payload.startswith("Would move"):
-        payload = payload[len("Would move") :].strip()
 
-    parts = payload.rsplit("->", 1)
-    if len(parts) != 2:
-        return None, "missing '->' separator"
+def parse_line(line: bytes) -> Tuple[Optional[Tuple[Path, Path]], Optional[str]]:
+    match = DRY_RUN_LINE.match(line)
+    if match is None:
+        if DRY_RUN_PREFIX.match(line):
+            return None, "missing '->' separator"
+        return None, None
 
-    from_path = parts[0].strip()
-    to_path = parts[1].strip()
+    from_path = match.group(1).rstrip()
+    to_path = match.group(2)
     if not from_path or not to_path:
         return None, "missing source or target path"
 
-    return (Path(from_path), Path(to_path)), None
+    return (decode_path(from_path), decode_path(to_path)), None
+
+
+class DirectoryUnlinker:
+    """
+    Delete files relative to an open handle on their parent directory, so consecutive
+    deletes from one directory skip the kernel's full path walk. Falls back to plain
+    unlink where dir_fd is unsupported (e.g. Windows).
+    """
+
+    def __init__(self) -> None:
+        self._parent: Optional[str] = None
+        self._fd: Optional[int] = None
+        self._supported = os.unlink in os.supports_dir_fd and hasattr(os, "O_DIRECTORY")
+
+    def unlink(self, path: Path) -> None:
+        if not self._supported:
+            path.unlink()
+            return
+        parent, name = os.path.split(os.fspath(path))
+        if parent != self._parent:
+            self.close()
+            flags = os.O_DIRECTORY | getattr(os, "O_PATH", os.O_RDONLY)
+            self._fd = os.open(parent or ".", flags)
+            self._parent = parent
+        os.unlink(name, dir_fd=self._fd)
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = None
+        self._parent = None
+
+    def __enter__(self) -> "DirectoryUnlinker":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
 
 def parse_args() -> argparse.Namespace:
@@ -71,13 +110,13 @@ def main() -> int:
     args = parse_args()
     dryrun_path = Path(args.dryrun_file).expanduser()
     try:
-        handle = dryrun_path.open("r", encoding="utf-8", errors="replace")
+        handle = dryrun_path.open("rb")
     except OSError as exc:
         eprint(f"[error] Unable to read {dryrun_path}: {exc}")
         return 2
 
     errors = 0
-    with handle:
+    with handle, DirectoryUnlinker() as unlinker:
         for line_no, line in enumerate(handle, 1):
             parsed, error = parse_line(line)
             if error:
@@ -92,7 +131,7 @@ def main() -> int:
                 continue
 
             try:
-                from_path.unlink()
+                unlinker.unlink(from_path)
                 print(f"[DELETED] {from_path}")
             except FileNotFoundError:
                 errors += 1
@@ -8,6 +8,8 @@ Arguments:
   -w <sqlite3 where clause> (optional, default: none) - a where clause to filter which files to extract from the ddscan database.
   --dry-run (optional, default: false) - if set, the script will only print the files that would be extracted and to where, without actually extracting them.
   -v (optional, default: false) - if set, the script will print verbose output during extraction.
+  -j <jobs> (optional, default: 2 per CPU, max 16) - number of files extracted in parallel.
+  --index-db (optional, default: false) - if set, add a block/size index to the ddscan database to speed up the query. Without it the database is opened read-only.
   -h (optional) - display help message and exit.
 
   Also update the README.md file to include usage instructions for this script.
@@ -43,23 +45,34 @@ Arguments:
 """
 
 import argparse
+import errno
 import os
 import sqlite3
 import sys
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from itertools import chain
 from pathlib import Path
-from typing import Iterable, NamedTuple, Optional
+from typing import Deque, Dict, Iterable, Iterator, Optional, Set, Tuple, Union
 
 SECTOR_SIZE = 512
+FETCH_BATCH_SIZE = 10000
+SKIPPED_PATH_PARTS = frozenset(("", ".", ".."))
+HAVE_PREADV = hasattr(os, "preadv")
+HAVE_SENDFILE = hasattr(os, "sendfile")
+UTIME_ACCEPTS_FD = os.utime in os.supports_fd
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_JOBS = min(16, (os.cpu_count() or 1) * 2)
+OUTPUT_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+# sendfile into a regular file is rejected with one of these on some platforms.
+SENDFILE_UNSUPPORTED = {errno.EINVAL, errno.ENOSYS, errno.ENOTSOCK, getattr(errno, "EOPNOTSUPP", errno.EINVAL)}
 
 
-class FileEntry(NamedTuple):
-    file_id: int
-    name: str
-    path_dir: str
-    block: int
-    size: int
-    mtime: Optional[int]
+# Rows are used exactly as sqlite3 returns them:
+# (file_id, name, path_dir, block, size, mtime).
+FileEntry = Tuple[int, str, str, int, int, Optional[int]]
 
 
 def parse_args() -> argparse.Namespace:
@@ -93,44 +106,66 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Print verbose output during extraction",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Number of files extracted in parallel (default: {DEFAULT_JOBS})",
+    )
+    parser.add_argument(
+        "--index-db",
+        action="store_true",
+        help="Add a block/size index to the database to speed up the query (writes to the database; default: open it read-only)",
+    )
     return parser.parse_args()
 
 
-def normalize_subpath(raw: str) -> Path:
-    cleaned = raw.replace("\\", "/").lstrip("/")
+def normalize_subpath(raw: str) -> str:
     parts = []
-    for part in Path(cleaned).parts:
-        if part in ("", ".", ".."):
+    for part in raw.replace("\\", "/").split("/"):
+        if part in SKIPPED_PATH_PARTS:
             continue
         if part.endswith(":"):  # drop drive letters like C:
             continue
         parts.append(part)
-    return Path(*parts)
+    return "/".join(parts)
+
 
+def open_database(db_path: Path, index_db: bool) -> sqlite3.Connection:
+    """Open the ddscan database read-only unless --index-db asked to write an index."""
+    if index_db:
+        return sqlite3.connect(str(db_path))
+    return sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
 
-def fetch_entries(conn: sqlite3.Connection, where_clause: Optional[str], limit: Optional[int]) -> Iterable[FileEntry]:
+
+def prepare_connection(conn: sqlite3.Connection, index_db: bool) -> None:
+    """Tune the connection for one large read; with index_db, index files by block/size."""
+    conn.execute("PRAGMA mmap_size = 30000000000")
+    conn.execute("PRAGMA cache_size = -524288")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    if index_db:
+        # The only write, and only on request: the database may be evidence.
+        # Without the index the query still works, it just sorts in temp storage.
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_files_block_size ON files(block, size)")
+    # Nothing below writes; reject any stray statement that would.
+    conn.execute("PRAGMA query_only = 1")
+
+
+def fetch_entries(conn: sqlite3.Connection, where_clause: Optional[str], limit: Optional[int]) -> Iterator[FileEntry]:
     base_filter = "f.block IS NOT NULL AND f.size IS NOT NULL"
     if where_clause:
         base_filter = f"{base_filter} AND ({where_clause})"
 
+    # SQLite takes the bare columns of a MIN() aggregate from the row holding the
+    # minimum, so this keeps the lowest _id per block/size like the old window query.
     query = f"""
-    WITH ranked AS (
-        SELECT
-            f._id AS file_id,
-            f.name,
-            f.block,
-            f.size,
-            f.date,
-            p.path AS path_dir,
-            ROW_NUMBER() OVER (PARTITION BY f.block, f.size ORDER BY f._id) AS rn
-        FROM files f
-        JOIN paths p ON f.path = p."index"
-        WHERE {base_filter}
-    )
-    SELECT file_id, name, block, size, date, path_dir
-    FROM ranked
-    WHERE rn = 1
-    ORDER BY block ASC
+    SELECT MIN(f._id) AS file_id, f.name, p.path AS path_dir, f.block, f.size, f.date
+    FROM files f
+    JOIN paths p ON f.path = p."index"
+    WHERE {base_filter}
+    GROUP BY f.block, f.size
+    ORDER BY f.block ASC, f.size ASC
     """
     params = []
     if limit is not None and limit > 0:
@@ -138,95 +173,228 @@ def fetch_entries(conn: sqlite3.Connection, where_clause: Optional[str], limit:
         params.append(limit)
 
     cursor = conn.execute(query, params)
-    for row in cursor:
-        yield FileEntry(
-            file_id=row[0],
-            name=row[1],
-            path_dir=row[5],
-            block=row[2],
-            size=row[3],
-            mtime=row[4],
-        )
+    cursor.arraysize = FETCH_BATCH_SIZE
+    while True:
+        rows = cursor.fetchmany()
+        if not rows:
+            break
+        yield from rows
 
 
-def ensure_within_output(output_root: Path, target: Path) -> bool:
+def ensure_within_output(output_resolved: Path, target: Path) -> bool:
     # resolve(strict=False) avoids FileNotFoundError before directories exist
     target_resolved = target.resolve(strict=False)
-    output_resolved = output_root.resolve(strict=False)
     return target_resolved == output_resolved or output_resolved in target_resolved.parents
 
 
+def advise(fp, offset: int, length: int, advice_name: str) -> None:
+    """Pass an access-pattern hint to the kernel when posix_fadvise is available."""
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fp.fileno(), offset, length, advice)
+    except OSError:
+        pass
+
+
+_copy_buffers = threading.local()
+# Without preadv the shared image handle has to be positioned with seek().
+_seek_lock = threading.Lock()
+
+
+def copy_buffer() -> memoryview:
+    """Return this thread's reusable read buffer for the read/write fallback."""
+    view = getattr(_copy_buffers, "view", None)
+    if view is None:
+        view = _copy_buffers.view = memoryview(bytearray(COPY_CHUNK_SIZE))
+    return view
+
+
+def read_into_at(fp, target: memoryview, offset: int) -> int:
+    """Fill target from offset in the file; returns the byte count read."""
+    if HAVE_PREADV:
+        return os.preadv(fp.fileno(), [target], offset)
+    with _seek_lock:
+        fp.seek(offset)
+        return fp.readinto(target) or 0
+
+
+def copy_range(image_fp, out_fd: int, offset: int, size: int) -> int:
+    """
+    Copy size bytes at offset in the image to out_fd; returns the byte count copied.
+    Uses sendfile so the data never enters user space, falling back to read/write.
+    """
+    copied = 0
+    if HAVE_SENDFILE:
+        try:
+            while copied < size:
+                sent = os.sendfile(out_fd, image_fp.fileno(), offset + copied, size - copied)
+                if sent == 0:
+                    return copied
+                copied += sent
+            return copied
+        except OSError as exc:
+            if copied or exc.errno not in SENDFILE_UNSUPPORTED:
+                raise
+
+    buffer = copy_buffer()
+    while copied < size:
+        count = read_into_at(image_fp, buffer[: min(size - copied, len(buffer))], offset + copied)
+        if count == 0:
+            break
+        written = 0
+        while written < count:
+            written += os.write(out_fd, buffer[written:count])
+        copied += count
+    return copied
+
+
+class DirectoryCache:
+    """
+    Checks and creates output directories once, shared between extraction threads.
+    Entries share a few directories, so resolve() and mkdir() run per directory, not per file.
+    """
+
+    def __init__(self, output_dir: Path) -> None:
+        self._output_resolved = output_dir.resolve(strict=False)
+        self._contained: Dict[str, bool] = {}
+        self._created: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def contains(self, directory: str) -> bool:
+        with self._lock:
+            contained = self._contained.get(directory)
+            if contained is None:
+                contained = ensure_within_output(self._output_resolved, Path(directory))
+                self._contained[directory] = contained
+            return contained
+
+    def ensure(self, directory: str) -> None:
+        with self._lock:
+            if directory in self._created:
+                return
+            os.makedirs(directory, exist_ok=True)
+            self._created.add(directory)
+
+
+def set_mtime(target: Union[int, str], mtime: int) -> bool:
+    """Set atime and mtime on an open fd or a path; returns False if that failed."""
+    try:
+        os.utime(target, times=(mtime, mtime))
+    except OSError:
+        return False
+    return True
+
+
+def extract_one(
+    entry: FileEntry,
+    image_fp,
+    image_size: int,
+    output_root: str,
+    directories: DirectoryCache,
+    dry_run: bool,
+    verbose: bool,
+) -> Tuple[bool, Optional[str]]:
+    """Extract a single entry; returns (extracted, message to print or None)."""
+    file_id, entry_name, path_dir, block, size, mtime = entry
+    if block < 0 or size is None or size <= 0:
+        return False, f"[skip] invalid block/size for id={file_id}" if verbose else None
+
+    offset = block * SECTOR_SIZE
+    end_offset = offset + size
+    if end_offset > image_size:
+        return False, f"[skip] id={file_id} offset+size exceeds image bounds" if verbose else None
+
+    # Plain strings here; Path objects would only be converted back for every syscall.
+    subdir = normalize_subpath(path_dir)
+    dest_dir = os.path.join(output_root, subdir) if subdir else output_root
+    name = os.path.basename(entry_name)
+    dest_path = os.path.join(dest_dir, name)
+
+    # A plain file name cannot leave its directory, so checking the directory suffices.
+    if name in SKIPPED_PATH_PARTS or not directories.contains(dest_dir):
+        return False, f"[skip] destination escapes output dir for id={file_id}: {dest_path}"
+
+    if dry_run:
+        return True, f"[dry-run] {dest_path} (offset {offset}, size {size})"
+
+    directories.ensure(dest_dir)
+
+    try:
+        out_fd = os.open(dest_path, OUTPUT_FLAGS, 0o666)
+    except FileExistsError:
+        return False, f"[skip] destination exists, not overwriting: {dest_path}"
+
+    mtime_set = True
+    try:
+        copied = copy_range(image_fp, out_fd, offset, size)
+        if copied == size and mtime and UTIME_ACCEPTS_FD:
+            # Set the time through the open fd; no second path lookup.
+            mtime_set = set_mtime(out_fd, mtime)
+    finally:
+        os.close(out_fd)
+    if copied != size:
+        os.unlink(dest_path)
+        return False, f"[skip] could not read full data for id={file_id}"
+    # Extracted ranges are not read again; keep them out of the page cache.
+    advise(image_fp, offset, size, "POSIX_FADV_DONTNEED")
+    if mtime and not UTIME_ACCEPTS_FD:
+        mtime_set = set_mtime(dest_path, mtime)
+
+    messages = []
+    if not mtime_set and verbose:
+        messages.append(f"[warn] failed to set mtime for {dest_path}")
+
+    if verbose:
+        dt = datetime.utcfromtimestamp(mtime).isoformat() + "Z" if mtime else "unknown"
+        messages.append(f"[ok] wrote {dest_path} (size {size}, mtime {dt})")
+    return True, "\n".join(messages) or None
+
+
 def extract_files(
     image_path: Path,
     entries: Iterable[FileEntry],
     output_dir: Path,
     dry_run: bool,
     verbose: bool,
+    jobs: int = DEFAULT_JOBS,
 ) -> None:
     output_dir.mkdir(parents=True, exist_ok=True)
     image_size = image_path.stat().st_size
+    directories = DirectoryCache(output_dir)
+    output_root = str(output_dir)
 
     extracted = 0
     skipped = 0
 
-    with image_path.open("rb") as image_fp:
-        for entry in entries:
-            if entry.block < 0 or entry.size is None or entry.size <= 0:
-                skipped += 1
-                if verbose:
-                    print(f"[skip] invalid block/size for id={entry.file_id}")
-                continue
-
-            offset = entry.block * SECTOR_SIZE
-            end_offset = offset + entry.size
-            if end_offset > image_size:
-                skipped += 1
-                if verbose:
-                    print(f"[skip] id={entry.file_id} offset+size exceeds image bounds")
-                continue
-
-            safe_dir = normalize_subpath(entry.path_dir)
-            dest_dir = output_dir / safe_dir
-            dest_path = dest_dir / Path(entry.name).name
-
-            if not ensure_within_output(output_dir, dest_path):
-                skipped += 1
-                print(f"[skip] destination escapes output dir for id={entry.file_id}: {dest_path}")
-                continue
-
-            if dry_run:
-                print(f"[dry-run] {dest_path} (offset {offset}, size {entry.size})")
-                extracted += 1
-                continue
-
-            dest_dir.mkdir(parents=True, exist_ok=True)
-
-            image_fp.seek(offset)
-            data = image_fp.read(entry.size)
-            if len(data) != entry.size:
-                skipped += 1
-                print(f"[skip] could not read full data for id={entry.file_id}")
-                continue
-
-            if dest_path.exists():
-                skipped += 1
-                print(f"[skip] destination exists, not overwriting: {dest_path}")
-                continue
-
-            with dest_path.open("wb") as out_fp:
-                out_fp.write(data)
-
-            if entry.mtime:
-                try:
-                    os.utime(dest_path, times=(entry.mtime, entry.mtime))
-                except OSError:
-                    if verbose:
-                        print(f"[warn] failed to set mtime for {dest_path}")
+    # Rows stream from the database; only a bounded window of them is in flight.
+    max_pending = jobs * 4
+    pending: Deque[Future] = deque()
 
+    def report(future: Future) -> None:
+        nonlocal extracted, skipped
+        ok, message = future.result()
+        if ok:
             extracted += 1
-            if verbose:
-                dt = datetime.utcfromtimestamp(entry.mtime).isoformat() + "Z" if entry.mtime else "unknown"
-                print(f"[ok] wrote {dest_path} (size {entry.size}, mtime {dt})")
+        else:
+            skipped += 1
+        if message:
+            print(message)
+
+    with image_path.open("rb", buffering=0) as image_fp, ThreadPoolExecutor(max_workers=jobs) as executor:
+        # Entries arrive sorted by block, so reads walk the image front to back.
+        advise(image_fp, 0, 0, "POSIX_FADV_SEQUENTIAL")
+        for entry in entries:
+            pending.append(
+                executor.submit(
+                    extract_one, entry, image_fp, image_size, output_root, directories, dry_run, verbose
+                )
+            )
+            if len(pending) >= max_pending:
+                report(pending.popleft())
+        while pending:
+            report(pending.popleft())
 
     print(f"Done. Extracted {extracted} file(s); skipped {skipped}.")
 
@@ -244,27 +412,37 @@ def main() -> None:
         print(f"Database not found: {db_path}", file=sys.stderr)
         sys.exit(1)
 
-    conn = sqlite3.connect(str(db_path))
+    if args.jobs < 1:
+        print("--jobs must be at least 1", file=sys.stderr)
+        sys.exit(1)
+
     try:
-        entries = list(fetch_entries(conn, args.where_clause, args.number))
+        conn = open_database(db_path, args.index_db)
+    except sqlite3.Error as exc:
+        print(f"Failed to open database: {exc}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        prepare_connection(conn, args.index_db)
+        entries = fetch_entries(conn, args.where_clause, args.number)
+        first = next(entries, None)
+        if first is None:
+            print("No files matched the selection criteria.", file=sys.stderr)
+            sys.exit(1)
+
+        extract_files(
+            image_path=image_path,
+            entries=chain([first], entries),
+            output_dir=output_dir,
+            dry_run=args.dry_run,
+            verbose=args.verbose,
+            jobs=args.jobs,
+        )
     except sqlite3.DatabaseError as exc:
         print(f"Failed to read database: {exc}", file=sys.stderr)
         sys.exit(1)
     finally:
         conn.close()
 
-    if not entries:
-        print("No files matched the selection criteria.", file=sys.stderr)
-        sys.exit(1)
-
-    extract_files(
-        image_path=image_path,
-        entries=entries,
-        output_dir=output_dir,
-        dry_run=args.dry_run,
-        verbose=args.verbose,
-    )
-
 
 if __name__ == "__main__":
     main()
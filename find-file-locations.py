@@ -14,13 +14,16 @@ The script will read the disk image from end to end and print all file locations
 """
 
 import argparse
+import mmap
 import os
 import sys
 from pathlib import Path
-from typing import Generator, Iterable
+from typing import Generator, Iterable, List, Sequence, Tuple
 
 
 DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024  # 8 MiB
+ANCHOR_BYTES = 64
+ANCHOR_MIN_NEEDLE = 64 * 1024  # Needles at least this long are located by anchor first.
 
 
 def parse_args() -> argparse.Namespace:
@@ -44,50 +47,64 @@ def parse_args() -> argparse.Namespace:
 
 def stream_find(
     image_path: Path,
-    needle: bytes,
+    needles: Sequence[bytes],
     chunk_size: int = DEFAULT_CHUNK_SIZE,
     verbose: bool = False,
     label: str = "",
-) -> Generator[int, None, None]:
+) -> Generator[Tuple[int, int], None, None]:
     """
-    Stream through the image file and yield byte offsets where `needle` is found.
+    Map the image file once and yield (needle index, byte offset) for every match of
+    any of `needles`.
+    The image is searched in windows of `chunk_size` bytes; every needle is searched
+    in a window while it is still in the page cache, so the image is read only once.
+    Windows overlap by one pattern length less a byte inside the map, so nothing is copied.
+    Long needles are located by their first ANCHOR_BYTES and only verified in full
+    at anchor hits.
     """
-    needle_len = len(needle)
-    if needle_len == 0:
+    searches = []
+    for index, needle in enumerate(needles):
+        if not needle:
+            continue
+        use_anchor = len(needle) >= ANCHOR_MIN_NEEDLE
+        pattern = needle[:ANCHOR_BYTES] if use_anchor else needle
+        searches.append((index, needle, pattern, use_anchor))
+    if not searches:
         return
 
-    chunk_size = max(chunk_size, needle_len + 1)
-    processed = 0
-    prev_tail = b""
+    chunk_size = max(chunk_size, max(len(pattern) for _, _, pattern, _ in searches) + 1)
     next_report = 0
     report_step = 1 * 1024 * 1024 * 1024  # 1 GiB
 
-    with image_path.open("rb", buffering=0) as fp:
-        while True:
-            chunk = fp.read(chunk_size)
-            if not chunk:
-                break
-
-            data = prev_tail + chunk
-            search_from = 0
-            while True:
-                idx = data.find(needle, search_from)
-                if idx == -1:
-                    break
-                match_offset = processed - len(prev_tail) + idx
-                yield match_offset
-                search_from = idx + 1
-
-            processed += len(chunk)
-            if needle_len > 1:
-                prev_tail = data[-(needle_len - 1) :]
-            else:
-                prev_tail = b""
-
-            if verbose and processed >= next_report:
-                prefix = f"[info][{label}] " if label else "[info] "
-                print(f"{prefix}scanned {processed // (1024 * 1024)} MiB", file=sys.stderr)
-                next_report += report_step
+    with image_path.open("rb") as fp:
+        try:
+            mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty image; nothing to search.
+            return
+        with mapped:
+            if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            image_size = len(mapped)
+            window_start = 0
+            while window_start < image_size:
+                window_end = min(window_start + chunk_size, image_size)
+                for index, needle, pattern, use_anchor in searches:
+                    needle_len = len(needle)
+                    # Matches starting inside the window may run into the next one.
+                    search_end = min(window_end + len(pattern) - 1, image_size)
+                    idx = mapped.find(pattern, window_start, search_end)
+                    while idx != -1:
+                        # A bounded find over exactly needle_len bytes verifies in place.
+                        if not use_anchor or mapped.find(needle, idx, idx + needle_len) == idx:
+                            yield index, idx
+                        idx = mapped.find(pattern, idx + 1, search_end)
+
+                processed = window_end
+                window_start = window_end
+                if verbose and processed >= next_report:
+                    prefix = f"[info][{label}] " if label else "[info] "
+                    print(f"{prefix}scanned {processed // (1024 * 1024)} MiB", file=sys.stderr)
+                    next_report += report_step
 
 
 def format_offset(offset: int) -> str:
@@ -112,23 +129,28 @@ def main() -> None:
             print(f"Cannot search for empty file: {fp}", file=sys.stderr)
             sys.exit(1)
 
-    any_matches = False
-    for fp in file_paths:
-        needle = fp.read_bytes()
-        label = fp.name
-        if args.verbose:
+    needles = [fp.read_bytes() for fp in file_paths]
+    labels = [fp.name for fp in file_paths]
+    if args.verbose:
+        for label, needle in zip(labels, needles):
             print(
                 f"[info][{label}] searching for {len(needle)} bytes inside {image_path}",
                 file=sys.stderr,
             )
 
-        matches = list(stream_find(image_path, needle, verbose=args.verbose, label=label))
-        if matches:
+    # One pass over the image serves every searched file.
+    matches: List[List[int]] = [[] for _ in needles]
+    for index, offset in stream_find(image_path, needles, verbose=args.verbose):
+        matches[index].append(offset)
+
+    any_matches = False
+    for label, offsets in zip(labels, matches):
+        if offsets:
             any_matches = True
-            for offset in matches:
+            for offset in offsets:
                 print(f"{label}: {format_offset(offset)}")
             if args.verbose:
-                print(f"[info][{label}] found {len(matches)} occurrence(s).", file=sys.stderr)
+                print(f"[info][{label}] found {len(offsets)} occurrence(s).", file=sys.stderr)
         else:
             if args.verbose:
                 print(f"[info][{label}] no occurrences found.", file=sys.stderr)
@@ -15,10 +15,11 @@ import mmap
 import os
 import sys
 from pathlib import Path
-from typing import BinaryIO, Optional, TextIO
+from typing import BinaryIO, List, Optional, TextIO, Tuple
 
 DEFAULT_BYTES_PER_LINE = 16
-READ_CHUNK_SIZE = 8192
+READ_CHUNK_SIZE = 1024 * 1024
+PREFETCH_SCREENS = 8
 
 
 def eprint(message: str) -> None:
@@ -40,7 +41,7 @@ def parse_args() -> argparse.Namespace:
 
 
 def format_hex_line(data: bytes) -> str:
-    return " ".join(f"{value:02x}" for value in data)
+    return data.hex(" ")
 
 
 def bytes_per_line_from_columns(columns: int) -> int:
@@ -54,6 +55,9 @@ class DataSource:
     def read(self, offset: int, size: int) -> bytes:
         raise NotImplementedError
 
+    def prefetch(self, offset: int, size: int) -> None:
+        return None
+
     def close(self) -> None:
         return None
 
@@ -64,6 +68,8 @@ class MMapDataSource(DataSource):
         self._size = path.stat().st_size
         if self._size:
             self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(self._mmap, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                self._mmap.madvise(mmap.MADV_SEQUENTIAL)
             super().__init__(self._size)
         else:
             self._mmap = None
@@ -77,6 +83,15 @@ class MMapDataSource(DataSource):
             return b""
         return self._mmap[offset:end]
 
+    def prefetch(self, offset: int, size: int) -> None:
+        """Ask the kernel to start paging in a range the pager is about to show."""
+        if self._mmap is None or not hasattr(mmap, "MADV_WILLNEED"):
+            return
+        start = max(offset, 0) // mmap.PAGESIZE * mmap.PAGESIZE
+        end = min(offset + size, self.length)
+        if start < end:
+            self._mmap.madvise(mmap.MADV_WILLNEED, start, end - start)
+
     def close(self) -> None:
         if self._mmap is not None:
             self._mmap.close()
@@ -96,6 +111,17 @@ class BufferDataSource(DataSource):
 
 
 def write_hex_stream(reader: BinaryIO, writer: TextIO, bytes_per_line: int) -> None:
+    # Hex text is pure ASCII, so encode it once per chunk and bypass the text layer.
+    binary_writer: Optional[BinaryIO] = getattr(writer, "buffer", None)
+    if binary_writer is not None:
+        writer.flush()
+
+    def emit(text: str) -> None:
+        if binary_writer is not None:
+            binary_writer.write(text.encode("ascii"))
+        else:
+            writer.write(text)
+
     remainder = b""
     while True:
         chunk = reader.read(READ_CHUNK_SIZE)
@@ -104,19 +130,27 @@ def write_hex_stream(reader: BinaryIO, writer: TextIO, bytes_per_line: int) -> N
         data = remainder + chunk
         line_count = len(data) // bytes_per_line
         end = line_count * bytes_per_line
-        for offset in range(0, end, bytes_per_line):
-            writer.write(format_hex_line(data[offset : offset + bytes_per_line]))
-            writer.write("\n")
+        if line_count:
+            # One write per chunk instead of two per line.
+            lines = [
+                format_hex_line(data[offset : offset + bytes_per_line])
+                for offset in range(0, end, bytes_per_line)
+            ]
+            lines.append("")
+            emit("\n".join(lines))
         remainder = data[end:]
     if remainder:
-        writer.write(format_hex_line(remainder))
-        writer.write("\n")
+        emit(format_hex_line(remainder) + "\n")
+    if binary_writer is not None:
+        binary_writer.flush()
 
 
 def pager(stdscr: curses.window, source: DataSource) -> None:
     curses.curs_set(0)
     stdscr.keypad(True)
     top_offset = 0
+    cached_key: Optional[Tuple[int, int, int]] = None
+    cached_lines: List[str] = []
 
     while True:
         stdscr.erase()
@@ -135,12 +169,23 @@ def pager(stdscr: curses.window, source: DataSource) -> None:
             top_line = max_top_line
             top_offset = top_line * bytes_per_line
 
-        for line_index in range(lines_visible):
-            offset = (top_line + line_index) * bytes_per_line
-            if offset >= source.length:
-                break
-            chunk = source.read(offset, bytes_per_line)
-            stdscr.addnstr(line_index, 0, format_hex_line(chunk), cols)
+        # Keys that do not scroll (or scroll past an edge) redraw the same lines.
+        render_key = (top_line, lines_visible, bytes_per_line)
+        if render_key != cached_key:
+            # Page in the visible screen and the next few ahead of scrolling.
+            source.prefetch(
+                top_line * bytes_per_line,
+                lines_visible * bytes_per_line * PREFETCH_SCREENS,
+            )
+            # One read for the whole screen, then slice lines out of it.
+            window = source.read(top_line * bytes_per_line, lines_visible * bytes_per_line)
+            cached_lines = [
+                format_hex_line(window[start : start + bytes_per_line])
+                for start in range(0, len(window), bytes_per_line)
+            ]
+            cached_key = render_key
+        for line_index, text in enumerate(cached_lines):
+            stdscr.addnstr(line_index, 0, text, cols)
 
         stdscr.refresh()
         key = stdscr.getch()
@@ -188,7 +233,10 @@ def main() -> int:
                 return run_interactive(source)
             finally:
                 source.close()
-        with path.open("rb") as reader:
+        # Unbuffered: each read is one os.read() straight into the chunk.
+        with path.open("rb", buffering=0) as reader:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(reader.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
             write_hex_stream(reader, sys.stdout, DEFAULT_BYTES_PER_LINE)
         return 0
 
@@ -197,7 +245,7 @@ def main() -> int:
         source = BufferDataSource(data)
         return run_interactive(source)
 
-    write_hex_stream(sys.stdin.buffer, sys.stdout, DEFAULT_BYTES_PER_LINE)
+    write_hex_stream(sys.stdin.buffer.raw, sys.stdout, DEFAULT_BYTES_PER_LINE)
     return 0
 
 
@@ -16,10 +16,13 @@ from __future__ import annotations
 import argparse
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, Optional, TextIO
+from typing import Iterator, List, Optional, Tuple
 
 DEFAULT_OUTPUT_NAME = "filesizes.txt"
+WRITE_BUFFER_SIZE = 64 * 1024
+DEFAULT_JOBS = 8
 
 
 def eprint(message: str) -> None:
@@ -51,6 +54,13 @@ def parse_args() -> argparse.Namespace:
         "--output",
         help="Output file path (default: <base>/filesizes.txt).",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Directories listed in parallel (default: {DEFAULT_JOBS}).",
+    )
     return parser.parse_args()
 
 
@@ -63,55 +73,114 @@ def resolve_output_path(base_path: Path, output_arg: Optional[str]) -> Path:
     return (base_path / output_path).resolve()
 
 
-def iter_files(base_path: Path) -> Iterable[Path]:
-    for root, dirnames, filenames in os.walk(base_path):
-        dirnames.sort()
-        filenames.sort()
-        for name in filenames:
-            yield Path(root) / name
+def scan_directory(
+    directory: str, prefix_len: int
+) -> Tuple[List[Tuple[str, str, int]], List[str], List[str]]:
+    """
+    List one directory: files as (path, relative posix path, size) and subdirectory
+    paths, both sorted by name, plus warnings to print. Runs on a worker thread.
+    """
+    try:
+        with os.scandir(directory) as iterator:
+            entries = sorted(iterator, key=lambda e: e.name)
+    except OSError:
+        return [], [], []
+
+    files: List[Tuple[str, str, int]] = []
+    subdirs: List[str] = []
+    warnings: List[str] = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            # Like os.walk: symlinked directories are neither walked nor listed.
+            if not entry.is_symlink():
+                subdirs.append(entry.path)
+            continue
+
+        try:
+            size = entry.stat().st_size
+        except OSError as exc:
+            warnings.append(f"[warn] Failed to stat {entry.path}: {exc}")
+            continue
+        rel_path = entry.path[prefix_len:]
+        if os.sep != "/":
+            rel_path = rel_path.replace(os.sep, "/")
+        files.append((entry.path, rel_path, size))
+    return files, subdirs, warnings
+
+
+def iter_files(base_path: Path, jobs: int = DEFAULT_JOBS) -> Iterator[Tuple[str, str, int]]:
+    """
+    Yield (path, relative posix path, size) for every file under base_path, in the
+    same top-down, name-sorted order as os.walk. Sizes come from DirEntry.stat and
+    paths stay plain strings, so no Path is built per file.
+    The next directories in visiting order are listed ahead on a thread pool, so
+    slow (e.g. network) directory reads overlap while the output order stays fixed.
+    """
+    # os.path.join(base, "") appends exactly one separator, even for a root directory.
+    prefix_len = len(os.path.join(str(base_path), ""))
+    max_pending = jobs * 2
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        # Directories still to visit, last one next; each holds its listing future once submitted.
+        stack: List[List] = [[str(base_path), None]]
+        pending = 0
+        while stack:
+            index = len(stack) - 1
+            while pending < max_pending and index >= 0:
+                entry = stack[index]
+                if entry[1] is None:
+                    entry[1] = executor.submit(scan_directory, entry[0], prefix_len)
+                    pending += 1
+                index -= 1
+
+            _, future = stack.pop()
+            pending -= 1
+            files, subdirs, warnings = future.result()
+            for warning in warnings:
+                eprint(warning)
+            yield from files
+            stack.extend([path, None] for path in reversed(subdirs))
+
+
+def write_all(fd: int, data: bytearray) -> None:
+    written = 0
+    while written < len(data):
+        written += os.write(fd, data[written:])
 
 
 def write_sizes(
     base_path: Path,
     output_path: Path,
-    writer: Optional[TextIO],
+    out_fd: int,
     verbose: bool,
+    jobs: int = DEFAULT_JOBS,
 ) -> None:
-    output_rel: Optional[Path] = None
+    output_rel: Optional[str] = None
     try:
-        output_rel = output_path.relative_to(base_path)
+        output_rel = output_path.relative_to(base_path).as_posix()
     except ValueError:
         output_rel = None
 
-    for file_path in iter_files(base_path):
-        if output_rel is not None:
-            try:
-                if file_path.relative_to(base_path) == output_rel:
-                    continue
-            except ValueError:
-                pass
-
-        try:
-            size = file_path.stat().st_size
-        except OSError as exc:
-            eprint(f"[warn] Failed to stat {file_path}: {exc}")
+    # Lines are collected and written with one os.write per WRITE_BUFFER_SIZE bytes.
+    buffer = bytearray()
+    for file_path, rel_path, size in iter_files(base_path, jobs):
+        if rel_path == output_rel:
             continue
 
-        rel_path = file_path.relative_to(base_path).as_posix()
-        line = f"{size} {rel_path}\n"
-
-        if writer is None:
-            print(line, end="")
-        else:
-            try:
-                writer.write(line)
-            except OSError as exc:
-                eprint(f"[error] Failed to write entry for {file_path}: {exc}")
-                continue
+        buffer += f"{size} {rel_path}\n".encode("utf-8", "surrogateescape")
+        if len(buffer) >= WRITE_BUFFER_SIZE:
+            write_all(out_fd, buffer)
+            buffer.clear()
 
         if verbose:
             eprint(f"[info] Recorded {rel_path} ({size} bytes)")
 
+    if buffer:
+        write_all(out_fd, buffer)
+
 
 def main() -> int:
     args = parse_args()
@@ -120,6 +189,10 @@ def main() -> int:
         eprint(f"Base path is not a directory: {base_path}")
         return 1
 
+    if args.jobs < 1:
+        eprint("Jobs must be a positive integer.")
+        return 1
+
     output_path = resolve_output_path(base_path, args.output)
     if output_path.exists() and not output_path.is_file():
         eprint(f"[error] Expected file at {output_path}, found non-file.")
@@ -128,13 +201,18 @@ def main() -> int:
     if args.dry_run:
         if args.verbose:
             eprint(f"[info] Dry run: would write to {output_path}")
-        write_sizes(base_path, output_path, None, args.verbose)
+        sys.stdout.flush()
+        try:
+            write_sizes(base_path, output_path, sys.stdout.fileno(), args.verbose, args.jobs)
+        except OSError as exc:
+            eprint(f"[error] Failed to write to stdout: {exc}")
+            return 1
         return 0
 
     try:
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        with output_path.open("w", encoding="utf-8", newline="\n") as writer:
-            write_sizes(base_path, output_path, writer, args.verbose)
+        with output_path.open("wb", buffering=0) as writer:
+            write_sizes(base_path, output_path, writer.fileno(), args.verbose, args.jobs)
     except OSError as exc:
         eprint(f"[error] Failed to write {output_path}: {exc}")
         return 1
@@ -11,16 +11,25 @@ from __future__ import annotations
 
 import argparse
 import hashlib
+import mmap
 import os
 import sys
+import threading
+from array import array
+from bisect import bisect_left
 from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from time import monotonic
-from typing import Deque, Optional, Set, TextIO, Tuple
+from typing import BinaryIO, Deque, Dict, FrozenSet, Iterator, List, Optional, Set, TextIO, Tuple
 
 HASH_FILE_NAME = "hashes.txt"
 DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024  # 8 MiB
 STATS_WINDOW_SECONDS = 60
+DEFAULT_JOBS = min(8, os.cpu_count() or 1)
+HAVE_FADVISE = hasattr(os, "posix_fadvise")
+WRITE_BUFFER_SIZE = 1024 * 1024
+MMAP_MIN_SIZE = 1024 * 1024
 
 
 def eprint(message: str) -> None:
@@ -32,7 +41,10 @@ class StatsTracker:
         self.enabled = enabled
         self.start_time = monotonic()
         self.last_report_time = self.start_time
-        self.window: Deque[Tuple[float, int]] = deque()
+        # Sliding window as two flat arrays; entries before _head have expired.
+        self._times = array("d")
+        self._sizes = array("q")
+        self._head = 0
         self.window_bytes = 0
         self.window_files = 0
         self.total_bytes = 0
@@ -40,10 +52,18 @@ class StatsTracker:
 
     def _prune_window(self, now: float) -> None:
         cutoff = now - STATS_WINDOW_SECONDS
-        while self.window and self.window[0][0] < cutoff:
-            _, size = self.window.popleft()
-            self.window_bytes -= size
-            self.window_files -= 1
+        head = self._head
+        if head >= len(self._times) or self._times[head] >= cutoff:
+            return
+        # Timestamps are monotonic, so the expired prefix is found by bisection.
+        new_head = bisect_left(self._times, cutoff, head)
+        self.window_bytes -= sum(self._sizes[head:new_head])
+        self.window_files -= new_head - head
+        if new_head * 2 >= len(self._times):
+            del self._times[:new_head]
+            del self._sizes[:new_head]
+            new_head = 0
+        self._head = new_head
 
     def _report(self, now: float, force: bool = False) -> None:
         if not self.enabled or self.total_files == 0:
@@ -53,9 +73,8 @@ class StatsTracker:
 
         self._prune_window(now)
 
-        window_span = max(
-            now - (self.window[0][0] if self.window else self.start_time), 1e-9
-        )
+        oldest = self._times[self._head] if self._head < len(self._times) else self.start_time
+        window_span = max(now - oldest, 1e-9)
         total_span = max(now - self.start_time, 1e-9)
 
         window_mib = self.window_bytes / (1024 * 1024)
@@ -76,7 +95,8 @@ class StatsTracker:
         now = monotonic()
         self.total_files += 1
         self.total_bytes += size_bytes
-        self.window.append((now, size_bytes))
+        self._times.append(now)
+        self._sizes.append(size_bytes)
         self.window_bytes += size_bytes
         self.window_files += 1
         self._prune_window(now)
@@ -106,6 +126,21 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULT_CHUNK_SIZE,
         help="Chunk size in bytes when reading files (default: 8 MiB).",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Number of files hashed in parallel (default: {DEFAULT_JOBS}).",
+    )
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help=(
+            "Hash files of 1 MiB or more through mmap instead of read(). Faster on healthy "
+            "disks, but a read error on damaged media kills the process with SIGBUS."
+        ),
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -125,11 +160,47 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def hash_file(path: Path, chunk_size: int) -> str:
+_read_buffers = threading.local()
+
+
+def read_buffer(chunk_size: int) -> memoryview:
+    """Return this thread's reusable read buffer of chunk_size bytes."""
+    view = getattr(_read_buffers, "view", None)
+    if view is None or len(view) != chunk_size:
+        view = _read_buffers.view = memoryview(bytearray(chunk_size))
+    return view
+
+
+def hash_mapped(handle: BinaryIO, digest: hashlib._Hash) -> bool:
+    """Feed the whole file to digest through a read-only map; False if it cannot be mapped."""
+    try:
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return False
+    with mapped:
+        if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        digest.update(mapped)
+    if HAVE_FADVISE:
+        # Hashed once and never read again; keep it from evicting the rest of the tree.
+        os.posix_fadvise(handle.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+    return True
+
+
+def hash_file(path: str, chunk_size: int, size: int = 0, use_mmap: bool = False) -> str:
     digest = hashlib.sha256()
-    with path.open("rb", buffering=0) as handle:
-        for chunk in iter(lambda: handle.read(chunk_size), b""):
-            digest.update(chunk)
+    with open(path, "rb", buffering=0) as handle:
+        if HAVE_FADVISE:
+            # Doubles kernel readahead, so each worker keeps the device queue busier.
+            os.posix_fadvise(handle.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        if use_mmap and size >= MMAP_MIN_SIZE and hash_mapped(handle, digest):
+            return digest.hexdigest()
+        view = read_buffer(chunk_size)
+        while True:
+            count = handle.readinto(view)
+            if not count:
+                break
+            digest.update(view[:count])
     return digest.hexdigest()
 
 
@@ -142,7 +213,7 @@ def normalize_existing_path(rel_path: str) -> Optional[str]:
     return Path(cleaned).as_posix()
 
 
-def read_existing_hashes(hash_path: Path) -> Set[str]:
+def read_existing_hashes(hash_path: Path) -> FrozenSet[str]:
     entries: Set[str] = set()
     try:
         with hash_path.open("r", encoding="utf-8") as handle:
@@ -158,10 +229,10 @@ def read_existing_hashes(hash_path: Path) -> Set[str]:
                 if not normalized:
                     eprint(f"[warn] {hash_path}:{line_no}: invalid relative path: {parts[1]}")
                     continue
-                entries.add(normalized)
+                entries.add(sys.intern(normalized))
     except OSError as exc:
         eprint(f"[warn] Failed to read {hash_path}: {exc}")
-    return entries
+    return frozenset(entries)
 
 
 def rotate_hash_file(hash_path: Path) -> bool:
@@ -183,82 +254,152 @@ def rotate_hash_file(hash_path: Path) -> bool:
         index += 1
 
 
-def process_directory(
-    directory: Path,
-    base_path: Path,
-    writer: TextIO,
-    chunk_size: int,
-    verbose: bool,
-    stats: StatsTracker,
-    existing_paths: Optional[Set[str]],
-    ignore_existing: bool,
-) -> None:
+def scan_directory(
+    directory: str, prefix_len: int, skip_paths: Optional[FrozenSet[str]]
+) -> List[Tuple[str, Optional[str], int, Tuple[int, int]]]:
+    """
+    List one directory in case-insensitive name order, files and subdirectories
+    interleaved: regular files as (path, relative posix path, size, (device, inode)),
+    subdirectories as (path, None, 0, (0, 0)).
+    Files whose relative path is in skip_paths are left out before they are stat'ed.
+    """
     try:
         with os.scandir(directory) as iterator:
             entries = sorted(iterator, key=lambda e: e.name.lower())
     except OSError as exc:
         eprint(f"[error] Failed to list {directory}: {exc}")
-        return
+        return []
 
+    listing: List[Tuple[str, Optional[str], int, Tuple[int, int]]] = []
     for entry in entries:
-        name = entry.name
         try:
             is_dir = entry.is_dir(follow_symlinks=False)
             is_file = entry.is_file(follow_symlinks=False)
         except OSError as exc:
-            eprint(f"[warn] Could not stat {Path(directory, name)}: {exc}")
+            eprint(f"[warn] Could not stat {entry.path}: {exc}")
             continue
 
-        if name == HASH_FILE_NAME:
+        if entry.name == HASH_FILE_NAME:
             continue
 
         if is_dir:
-            process_directory(
-                Path(directory, name),
-                base_path,
-                writer,
-                chunk_size,
-                verbose,
-                stats,
-                existing_paths,
-                ignore_existing,
-            )
+            listing.append((entry.path, None, 0, (0, 0)))
             continue
 
         if not is_file:
             continue
 
-        file_path = Path(directory, name)
-        rel_path = file_path.relative_to(base_path).as_posix()
-        if ignore_existing and existing_paths is not None and rel_path in existing_paths:
+        rel_path = entry.path[prefix_len:]
+        if os.sep != "/":
+            rel_path = rel_path.replace(os.sep, "/")
+        if skip_paths is not None and rel_path in skip_paths:
             continue
 
         try:
-            file_size = file_path.stat().st_size
+            # DirEntry caches this stat; the size is reused for the stats tracker.
+            st = entry.stat(follow_symlinks=False)
         except OSError as exc:
-            eprint(f"[warn] Failed to stat {file_path}: {exc}")
+            eprint(f"[warn] Failed to stat {entry.path}: {exc}")
             continue
-
-        try:
-            digest = hash_file(file_path, chunk_size)
-        except OSError as exc:
-            eprint(f"[warn] Failed to hash {file_path}: {exc}")
+        listing.append((entry.path, rel_path, st.st_size, (st.st_dev, st.st_ino)))
+    return listing
+
+
+def iter_file_runs(
+    directory: str, prefix_len: int, skip_paths: Optional[FrozenSet[str]] = None
+) -> Iterator[List[Tuple[str, Optional[str], int, Tuple[int, int]]]]:
+    """
+    Yield every regular file in hashes.txt order: depth first, each directory in
+    case-insensitive name order with subdirectories entered where they sort.
+    Files come in runs, broken wherever a subdirectory is entered, so a caller can
+    read each run in inode order and still write it in name order.
+    Paths stay plain strings from os.scandir; the relative path is a slice of the
+    full path past the base directory prefix of length prefix_len.
+    Subdirectories are entered through an explicit stack rather than recursion,
+    so deep trees cost no generator frames.
+    """
+    stack = [iter(scan_directory(directory, prefix_len, skip_paths))]
+    run: List[Tuple[str, Optional[str], int, Tuple[int, int]]] = []
+    while stack:
+        item = next(stack[-1], None)
+        if item is None:
+            stack.pop()
+            continue
+        if item[1] is None:
+            if run:
+                yield run
+                run = []
+            stack.append(iter(scan_directory(item[0], prefix_len, skip_paths)))
             continue
+        run.append(item)
+    if run:
+        yield run
+
+
+def measure_and_hash(
+    file_path: str, chunk_size: int, size: int, use_mmap: bool
+) -> Tuple[Optional[str], Optional[str]]:
+    """Return (digest, error message); runs on a worker thread."""
+    try:
+        return hash_file(file_path, chunk_size, size, use_mmap), None
+    except OSError as exc:
+        return None, f"[warn] Failed to hash {file_path}: {exc}"
+
+
+def process_directory(
+    directory: Path,
+    base_path: Path,
+    writer: TextIO,
+    chunk_size: int,
+    verbose: bool,
+    stats: StatsTracker,
+    existing_paths: Optional[FrozenSet[str]],
+    ignore_existing: bool,
+    jobs: int = DEFAULT_JOBS,
+    use_mmap: bool = False,
+) -> None:
+    # hashlib releases the GIL while hashing, so threads overlap reads and hashing.
+    # Results are written in traversal order. Each run of files is submitted whole,
+    # then output drains the queue back to max_pending before the next run.
+    max_pending = jobs * 4
+    pending: Deque[Tuple[str, str, int, Future]] = deque()
+    # os.path.join(base, "") appends exactly one separator, even for a root directory.
+    prefix_len = len(os.path.join(str(base_path), ""))
+
+    def record(file_path: str, rel_path: str, file_size: int, future: Future) -> None:
+        digest, error = future.result()
+        if error is not None:
+            eprint(error)
+            return
 
         try:
             writer.write(f"{digest} {rel_path}\n")
         except Exception as exc:  # noqa: BLE001
             eprint(f"[warn] Failed to record hash for {file_path}: {exc}")
-            continue
-
-        if ignore_existing and existing_paths is not None:
-            existing_paths.add(rel_path)
+            return
 
         stats.record(file_size)
 
         if verbose:
             eprint(f"[info] Hashed {file_path}")
 
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        skip_paths = existing_paths if ignore_existing else None
+        for run in iter_file_runs(str(directory), prefix_len, skip_paths):
+            # Inode order approximates block order, which saves seeks on spinning
+            # disks; results are still written in the run's name order.
+            futures: Dict[str, Future] = {}
+            for file_path, _, file_size, _ in sorted(run, key=lambda item: item[3]):
+                futures[file_path] = executor.submit(
+                    measure_and_hash, file_path, chunk_size, file_size, use_mmap
+                )
+            for file_path, rel_path, file_size, _ in run:
+                pending.append((file_path, rel_path, file_size, futures[file_path]))
+            while len(pending) >= max_pending:
+                record(*pending.popleft())
+        while pending:
+            record(*pending.popleft())
+
 
 def main() -> int:
     args = parse_args()
@@ -266,6 +407,9 @@ def main() -> int:
     if args.chunk_size <= 0:
         eprint("Chunk size must be a positive integer.")
         return 1
+    if args.jobs < 1:
+        eprint("Jobs must be a positive integer.")
+        return 1
     if not base_path.is_dir():
         eprint(f"Base path is not a directory: {base_path}")
         return 1
@@ -276,8 +420,8 @@ def main() -> int:
         return 1
 
     if args.ignore_existing:
-        existing_paths: Optional[Set[str]] = (
-            read_existing_hashes(output_path) if output_path.exists() else set()
+        existing_paths: Optional[FrozenSet[str]] = (
+            read_existing_hashes(output_path) if output_path.exists() else frozenset()
         )
         mode = "a"
     else:
@@ -287,7 +431,7 @@ def main() -> int:
         mode = "w"
 
     try:
-        writer = output_path.open(mode, encoding="utf-8", newline="\n")
+        writer = output_path.open(mode, encoding="utf-8", newline="\n", buffering=WRITE_BUFFER_SIZE)
     except OSError as exc:
         eprint(f"[error] Failed to open {output_path} for writing: {exc}")
         return 1
@@ -303,6 +447,8 @@ def main() -> int:
             stats,
             existing_paths,
             args.ignore_existing,
+            args.jobs,
+            args.mmap,
         )
     stats.finalize()
     eprint("Finished")
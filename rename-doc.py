@@ -6,10 +6,13 @@ from __future__ import annotations
 
 import argparse
 import logging
+import os
 import sys
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 import re
 
 import olefile
@@ -19,6 +22,25 @@ from hachoir.parser import createParser
 
 # Matches names like f1622085904_musik.doc -> postfix "musik"
 POSTFIX_REGEX = re.compile(r"^[A-Za-z]+[0-9]+_(.+)$")
+CURRENT_YEAR = datetime.now().year
+# An OLE compound file starts with a 512 byte header; anything shorter is not a .doc.
+OLE_HEADER_SIZE = 512
+# OleMetadata property names (summary and document summary information streams).
+OLE_META_ATTRS = olefile.OleMetadata.SUMMARY_ATTRIBS + olefile.OleMetadata.DOCSUM_ATTRIBS
+_MISSING = object()
+HACHOIR_DATE_KEYS = (
+    "Creation date",
+    "CreationDate",
+    "Create Date",
+    "Last Saved",
+    "Last modification",
+    "Modification date",
+)
+# A .doc has a few dozen metadata lines at most; stop parsing well past that.
+HACHOIR_MAX_LINES = 256
+DEFAULT_JOBS = os.cpu_count() or 1
+# Files handed to a worker process at a time.
+EXTRACT_CHUNK_SIZE = 32
 
 
 def parse_args() -> argparse.Namespace:
@@ -49,6 +71,13 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Do not make any changes.",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Number of processes reading metadata in parallel (default: {DEFAULT_JOBS}).",
+    )
     return parser.parse_args()
 
 
@@ -80,10 +109,9 @@ def extract_postfix(path: Path) -> str:
     return ""
 
 
-def valid_datetime(dt: Optional[datetime]) -> bool:
+def valid_datetime(dt: Optional[datetime], current_year: int = CURRENT_YEAR) -> bool:
     if not isinstance(dt, datetime):
         return False
-    current_year = datetime.now().year
     return 1900 <= dt.year <= current_year + 1
 
 
@@ -95,20 +123,17 @@ def extract_timestamp_with_olefile(path: Path, logger: logging.Logger) -> tuple[
             candidates = [
                 metadata.create_time,
                 metadata.last_saved_time,
-                metadata.modification_time,
+                getattr(metadata, "modification_time", None),
             ]
     except Exception as exc:
         logger.error("Failed to read metadata for %s: %s", path, exc)
         return None, None, False
 
-    found_any = bool(meta_dict)
-
     for dt in candidates:
         if valid_datetime(dt):
             return dt, meta_dict, True
-    if found_any:
-        return None, meta_dict, True
-    return None, None, False
+    # olefile parsed the container, so hachoir would not find more.
+    return None, meta_dict or None, True
 
 
 def extract_timestamp_with_hachoir(path: Path, logger: logging.Logger) -> tuple[Optional[datetime], Optional[dict], bool]:
@@ -134,27 +159,19 @@ def extract_timestamp_with_hachoir(path: Path, logger: logging.Logger) -> tuple[
     meta_dict = {}
     dt_candidate = None
     try:
-        for line in metadata.exportPlaintext() or []:
-            clean_line = line[2:] if line.startswith("- ") else line
-            key, _, value = clean_line.partition(":")
-            key = key.strip()
-            value = value.strip()
-            if key:
-                meta_dict[key] = value
+        lines = islice(metadata.exportPlaintext() or [], HACHOIR_MAX_LINES)
+        pairs = (
+            (line[2:] if line.startswith("- ") else line).partition(":")
+            for line in lines
+        )
+        meta_dict = {
+            key.strip(): value.strip() for key, _, value in pairs if key.strip()
+        }
     except Exception:
         pass
 
-    for key in (
-        "Creation date",
-        "CreationDate",
-        "Create Date",
-        "Last Saved",
-        "Last modification",
-        "Modification date",
-    ):
-        value = meta_dict.get(key)
-        if not value:
-            continue
+    # Try the date keys in order of preference; an unparsable value falls through.
+    for value in (meta_dict[key] for key in HACHOIR_DATE_KEYS if meta_dict.get(key)):
         try:
             dt_candidate = date_parser.parse(value)
             break
@@ -178,33 +195,32 @@ def extract_timestamp(path: Path, logger: logging.Logger) -> Tuple[Optional[date
     if found:
         return dt, meta, found
 
+    try:
+        if path.stat().st_size < OLE_HEADER_SIZE:
+            return None, None, False
+    except OSError:
+        return None, None, False
     return extract_timestamp_with_hachoir(path, logger)
 
 
 def metadata_to_dict(metadata: Optional[olefile.OleMetadata]) -> dict:
     if metadata is None:
         return {}
-    if hasattr(metadata, "__dict__") and metadata.__dict__:
-        return {k: v for k, v in metadata.__dict__.items() if not k.startswith("_")}
-
     collected = {}
-    for attr in dir(metadata):
-        if attr.startswith("_"):
-            continue
-        try:
-            value = getattr(metadata, attr)
-        except Exception:
-            continue
-        if callable(value):
-            continue
-        collected[attr] = value
+    for attr in OLE_META_ATTRS:
+        value = getattr(metadata, attr, _MISSING)
+        if value is not _MISSING:
+            collected[attr] = value
     return collected
 
 
 def build_target_path(
     source: Path, dt: datetime, postfix: str, output_dir: Optional[Path]
 ) -> Path:
-    base = dt.strftime("%Y-%m-%d_%H-%M-%S")
+    base = (
+        f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}"
+        f"_{dt.hour:02d}-{dt.minute:02d}-{dt.second:02d}"
+    )
     if postfix:
         base = f"{base}_{postfix}"
     ext = source.suffix or ".doc"
@@ -215,14 +231,62 @@ def build_target_path(
     return target_dir / f"{base}{ext}"
 
 
+class MessageLog:
+    """Collects error messages in a worker process; the main process logs them."""
+
+    def __init__(self) -> None:
+        self.messages: List[str] = []
+
+    def error(self, message: str, *args: object) -> None:
+        self.messages.append(message % args if args else message)
+
+
+def read_timestamp(path: Path) -> Tuple[Path, Optional[datetime], Optional[dict], List[str]]:
+    """Worker entry point: extract the timestamp of one file."""
+    log = MessageLog()
+    dt, metadata, _ = extract_timestamp(path, log)
+    return path, dt, metadata, log.messages
+
+
+def iter_timestamps(
+    files: List[Path], jobs: int
+) -> Iterable[Tuple[Path, Optional[datetime], Optional[dict], List[str]]]:
+    """
+    Yield read_timestamp results in file order. olefile parsing is pure Python,
+    so with more than one job it runs in worker processes.
+    """
+    if jobs == 1 or len(files) <= 1:
+        yield from map(read_timestamp, files)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(read_timestamp, files, chunksize=EXTRACT_CHUNK_SIZE)
+
+
+def existing_names(listings: Dict[Path, Set[str]], directory: Path) -> Set[str]:
+    """
+    Casefolded names in `directory`, listed once per run instead of a stat per
+    target. A target differing only in case from an existing file counts as taken.
+    """
+    names = listings.get(directory)
+    if names is None:
+        try:
+            names = {name.casefold() for name in os.listdir(directory)}
+        except OSError:
+            names = set()
+        listings[directory] = names
+    return names
+
+
 def process_file(
     path: Path,
+    dt: Optional[datetime],
+    metadata: Optional[dict],
     logger: logging.Logger,
     output_dir: Optional[Path],
     verbose: bool,
     dry_run: bool,
+    listings: Dict[Path, Set[str]],
 ) -> bool:
-    dt, metadata, _ = extract_timestamp(path, logger)
     if not dt:
         if metadata:
             print(f"{path}: {metadata}\n")
@@ -233,7 +297,8 @@ def process_file(
     postfix = extract_postfix(path)
     target_path = build_target_path(path, dt, postfix, output_dir)
 
-    if target_path.exists():
+    target_names = existing_names(listings, target_path.parent)
+    if target_path.name.casefold() in target_names:
         logger.error("Target already exists for %s -> %s", path, target_path)
         return False
 
@@ -245,6 +310,10 @@ def process_file(
     try:
         target_path.parent.mkdir(parents=True, exist_ok=True)
         path.rename(target_path)
+        target_names.add(target_path.name.casefold())
+        source_names = listings.get(path.parent)
+        if source_names is not None:
+            source_names.discard(path.name.casefold())
         if verbose:
             print(f"Moved {path} -> {target_path}")
         return True
@@ -262,6 +331,10 @@ def main() -> int:
         print(f"Input directory does not exist or is not a directory: {input_dir}", file=sys.stderr)
         return 1
 
+    if args.jobs < 1:
+        print("--jobs must be at least 1", file=sys.stderr)
+        return 1
+
     if output_dir and not args.dry_run:
         try:
             output_dir.mkdir(parents=True, exist_ok=True)
@@ -284,9 +357,15 @@ def main() -> int:
 
     processed = 0
     renamed = 0
-    for file_path in files:
+    listings: Dict[Path, Set[str]] = {}
+    # Metadata is read in parallel; renames stay serial in this process.
+    for file_path, dt, metadata, messages in iter_timestamps(files, args.jobs):
         processed += 1
-        if process_file(file_path, logger, output_dir, args.verbose, args.dry_run):
+        for message in messages:
+            logger.error("%s", message)
+        if process_file(
+            file_path, dt, metadata, logger, output_dir, args.verbose, args.dry_run, listings
+        ):
             renamed += 1
 
     if args.verbose:
@@ -3,16 +3,21 @@
 Rename recovered images and videos based on creation timestamps read with exiftool.
 
 Usage:
-  python rename-images.py [input_dir] [output_dir] [-v] [-n]
+  python rename-images.py [input_dir] [output_dir] [-v] [-n] [-j JOBS] [--all-files]
 """
 from __future__ import annotations
 
 import argparse
 import logging
+import multiprocessing.util
+import os
 import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Deque, Dict, Iterator, List, Optional, Set, Tuple
 import re
 
 import exiftool
@@ -57,9 +62,10 @@ VIDEO_EXTENSIONS = {
     ".mod",
     ".mts",
 }
+MEDIA_EXTENSIONS = frozenset(IMAGE_EXTENSIONS | VIDEO_EXTENSIONS)
 
 # Tags are ordered by preference.
-DATETIME_TAGS = [
+DATETIME_TAGS = (
     "EXIF:DateTimeOriginal",
     "EXIF:CreateDate",
     "XMP:CreateDate",
@@ -72,7 +78,23 @@ DATETIME_TAGS = [
     "IPTC:DateTimeCreated",
     "EXIF:GPSDateTime",
     "Composite:GPSDateTime",
-]
+)
+
+# Only the tags used for renaming are requested, so exiftool skips building the rest.
+# -fast skips trailer scans; -fast2 is avoided because it stops at the QuickTime mdat
+# atom and misses metadata in videos written with the moov atom last.
+EXIFTOOL_TAG_ARGS = (
+    "-fast",
+    *(f"-{tag}" for tag in DATETIME_TAGS),
+    "-File:MIMEType",
+    "-File:FileType",
+    "-ExifTool:Error",
+)
+
+# Files whose metadata is requested from exiftool in one round-trip.
+METADATA_BATCH_SIZE = 512
+DEFAULT_JOBS = os.cpu_count() or 1
+CURRENT_YEAR = datetime.now().year
 
 EXIF_DATE_PREFIX = re.compile(r"^(\d{4}):(\d{2}):(\d{2})")
 SPACE_PADDED_REGEX = re.compile(
@@ -108,6 +130,18 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Do not make any changes.",
     )
+    parser.add_argument(
+        "--all-files",
+        action="store_true",
+        help="Read metadata of every file, not only files with a known media extension.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Number of exiftool processes reading metadata in parallel (default: {DEFAULT_JOBS}).",
+    )
     return parser.parse_args()
 
 
@@ -123,14 +157,37 @@ def configure_logger(log_path: Path) -> logging.Logger:
     return logger
 
 
-def iter_files(input_dir: Path, output_dir: Optional[Path]) -> Iterable[Path]:
-    for path in input_dir.rglob("*"):
-        if not path.is_file():
-            continue
-        if output_dir and output_dir in path.parents:
-            # Avoid re-processing files already in the output directory.
+def iter_files(
+    input_dir: Path, output_dir: Optional[Path], media_only: bool = True
+) -> Iterator[Path]:
+    """
+    Walk input_dir top-down with os.scandir, in the same order as rglob, yielding
+    files lazily. Each directory is listed completely before its files are yielded,
+    so renames made while walking do not show up in the listing.
+    With media_only, files without a known media extension never reach exiftool.
+    """
+    # Avoid re-processing files already in the output directory.
+    skip_dir = str(output_dir) if output_dir else None
+    stack = [str(input_dir)]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as iterator:
+                entries = list(iterator)
+        except OSError:
             continue
-        yield path
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_file():
+                    if media_only and os.path.splitext(entry.name)[1].lower() not in MEDIA_EXTENSIONS:
+                        continue
+                    yield Path(entry.path)
+                elif entry.is_dir() and not entry.is_symlink() and entry.path != skip_dir:
+                    subdirs.append(entry.path)
+            except OSError:
+                continue
+        stack.extend(reversed(subdirs))
 
 
 def normalize_timestamp(raw_value: object) -> Optional[str]:
@@ -146,25 +203,34 @@ def normalize_timestamp(raw_value: object) -> Optional[str]:
 
     match = SPACE_PADDED_REGEX.match(text)
     if match:
-        return (
-            f"{match.group(1)}:{match.group(2).zfill(2)}:{match.group(3).zfill(2)} "
-            f"{match.group(4).zfill(2)}:{match.group(5).zfill(2)}:{match.group(6).zfill(2)}{match.group(7)}"
+        year, month, day, hour, minute, second, rest = match.groups()
+        # One % format builds the zero padded string without per-field temporaries.
+        return "%s:%02d:%02d %02d:%02d:%02d%s" % (
+            year, int(month), int(day), int(hour), int(minute), int(second), rest
         )
     return text
 
 
 def parse_datetime(metadata: dict) -> Optional[datetime]:
     for tag in DATETIME_TAGS:
-        cleaned = normalize_timestamp(metadata.get(tag))
+        raw_value = metadata.get(tag)
+        if raw_value is None:
+            # Most tags are absent; skip the normalize call for them.
+            continue
+        cleaned = normalize_timestamp(raw_value)
         if not cleaned:
             continue
         cleaned = cleaned.split(".")[0]
         cleaned = EXIF_DATE_PREFIX.sub(r"\1-\2-\3", cleaned)
         try:
-            dt = date_parser.parse(cleaned)
-        except (ValueError, TypeError, OverflowError):
-            continue
-        if dt.year < 1900 or dt.year > datetime.now().year + 1:
+            # Nearly every value is ISO shaped by now; dateutil handles the rest.
+            dt = datetime.fromisoformat(cleaned)
+        except ValueError:
+            try:
+                dt = date_parser.parse(cleaned)
+            except (ValueError, TypeError, OverflowError):
+                continue
+        if dt.year < 1900 or dt.year > CURRENT_YEAR + 1:
             continue
         if dt.tzinfo:
             dt = dt.astimezone()
@@ -204,51 +270,182 @@ def build_target_path(
 ) -> Path:
     prefix = "MOV_" if is_video_file else "IMG_"
     target_dir = output_dir if output_dir else source.parent
-    target_name = f"{prefix}{dt.strftime('%Y-%m-%d_%H-%M-%S')}{source.suffix}"
+    stamp = (
+        f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}"
+        f"_{dt.hour:02d}-{dt.minute:02d}-{dt.second:02d}"
+    )
+    target_name = f"{prefix}{stamp}{source.suffix}"
     return target_dir / target_name
 
 
-def read_metadata(et: exiftool.ExifTool, path: Path, logger: logging.Logger) -> Optional[dict]:
+def read_metadata_batch(
+    et: exiftool.ExifTool, paths: List[Path], logger: logging.Logger
+) -> List[Optional[dict]]:
+    """
+    Read metadata for `paths` with one exiftool request and return it in the same
+    order, None where exiftool returned nothing. If the batch fails, files are
+    retried one at a time so a single bad file does not cost the whole batch.
+    """
+    names = [str(path) for path in paths]
     try:
-        if hasattr(et, "get_metadata"):
-            data = et.get_metadata(str(path))
-        else:
-            data = et.get_metadata_batch([str(path)])
+        data = et.execute_json(*EXIFTOOL_TAG_ARGS, *names)
     except Exception as exc:
-        logger.error("Failed to read metadata for %s: %s", path, exc)
-        return None
-
-    if isinstance(data, list):
-        return data[0] if data else None
-    return data
-
-
-def process_file(
-    path: Path,
-    et: exiftool.ExifTool,
-    logger: logging.Logger,
-    output_dir: Optional[Path],
-    verbose: bool,
-    dry_run: bool,
-) -> bool:
-    metadata = read_metadata(et, path, logger)
+        if len(paths) == 1:
+            logger.error("Failed to read metadata for %s: %s", paths[0], exc)
+            return [None]
+        return [read_metadata_batch(et, [path], logger)[0] for path in paths]
+
+    if isinstance(data, dict):
+        data = [data]
+    data = data or []
+    by_source = {
+        entry.get("SourceFile"): entry for entry in data if isinstance(entry, dict)
+    }
+    if None in by_source and len(data) == len(paths):
+        # No SourceFile keys; exiftool answers in request order.
+        return list(data)
+    # exiftool reports SourceFile with forward slashes.
+    return [by_source.get(name) or by_source.get(name.replace(os.sep, "/")) for name in names]
+
+
+class MessageLog:
+    """Collects error messages in a worker process; the main process logs them."""
+
+    def __init__(self) -> None:
+        self.messages: List[str] = []
+
+    def error(self, message: str, *args: object) -> None:
+        self.messages.append(message % args if args else message)
+
+
+def analyze_metadata(
+    path: Path, metadata: Optional[dict], logger: logging.Logger
+) -> Optional[Tuple[datetime, bool]]:
+    """Return (timestamp, is video) for a file that should be renamed, else None."""
     if not metadata:
-        return False
+        return None
 
     if metadata.get("Error") or metadata.get("ExifTool:Error"):
         logger.error("ExifTool error for %s: %s", path, metadata.get("Error") or metadata.get("ExifTool:Error"))
-        return False
+        return None
 
     if not is_supported_media(metadata, path):
-        return False
+        return None
 
     dt = parse_datetime(metadata)
     if not dt:
+        return None
+    return dt, is_video(metadata, path)
+
+
+def analyze_batch(
+    et: exiftool.ExifTool, paths: List[Path], logger: logging.Logger
+) -> List[Optional[Tuple[datetime, bool]]]:
+    return [
+        analyze_metadata(path, metadata, logger)
+        for path, metadata in zip(paths, read_metadata_batch(et, paths, logger))
+    ]
+
+
+# The exiftool process owned by this worker process, started by init_worker.
+WORKER_EXIFTOOL: Optional[exiftool.ExifTool] = None
+
+
+def init_worker() -> None:
+    """Worker process initializer: start one exiftool that serves every batch of this worker."""
+    global WORKER_EXIFTOOL
+    WORKER_EXIFTOOL = exiftool.ExifTool()
+    WORKER_EXIFTOOL.run()
+    # Workers leave through multiprocessing's exit hooks, not atexit.
+    multiprocessing.util.Finalize(None, WORKER_EXIFTOOL.terminate, exitpriority=10)
+
+
+def analyze_batch_worker(
+    paths: List[Path],
+) -> Tuple[List[Optional[Tuple[datetime, bool]]], List[str]]:
+    """Worker entry point: analyze one batch with the worker's exiftool, results and errors returned."""
+    log = MessageLog()
+    results = analyze_batch(WORKER_EXIFTOOL, paths, log)
+    return results, log.messages
+
+
+def iter_analyzed(
+    files: Iterator[Path], jobs: int, logger: logging.Logger
+) -> Iterator[Tuple[Path, Optional[Tuple[datetime, bool]]]]:
+    """
+    Yield (path, analyze_metadata result) in file order. With more than one job,
+    batches are read by worker processes that each keep one exiftool running.
+    """
+    batches = iter(lambda: list(islice(files, METADATA_BATCH_SIZE)), [])
+    if jobs == 1:
+        with exiftool.ExifTool() as et:
+            for batch in batches:
+                yield from zip(batch, analyze_batch(et, batch, logger))
+        return
+
+    max_pending = jobs * 2
+    pending: Deque[Tuple[List[Path], Future]] = deque()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker) as executor:
+
+        def collect() -> Iterator[Tuple[Path, Optional[Tuple[datetime, bool]]]]:
+            batch, future = pending.popleft()
+            results, messages = future.result()
+            for message in messages:
+                logger.error("%s", message)
+            return zip(batch, results)
+
+        for batch in batches:
+            pending.append((batch, executor.submit(analyze_batch_worker, batch)))
+            if len(pending) >= max_pending:
+                yield from collect()
+        while pending:
+            yield from collect()
+
+
+def existing_names(listings: Dict[Path, Set[str]], directory: Path) -> Set[str]:
+    """
+    Casefolded names in `directory` as planned so far: listed once per run, then
+    kept up to date with every move instead of a stat per target. Names are
+    compared casefolded so a target that differs only in case from an existing
+    file counts as taken; os.rename would overwrite it on case-insensitive media.
+    """
+    names = listings.get(directory)
+    if names is None:
+        try:
+            names = {name.casefold() for name in os.listdir(directory)}
+        except OSError:
+            names = set()
+        listings[directory] = names
+    return names
+
+
+def plan_move(listings: Dict[Path, Set[str]], source: Path, target: Path) -> bool:
+    """Claim `target` for `source`; False if the name is already taken."""
+    target_names = existing_names(listings, target.parent)
+    target_key = target.name.casefold()
+    if target_key in target_names:
         return False
+    target_names.add(target_key)
+    source_names = listings.get(source.parent)
+    if source_names is not None:
+        source_names.discard(source.name.casefold())
+    return True
 
-    target_path = build_target_path(path, dt, output_dir, is_video(metadata, path))
 
-    if target_path.exists():
+def process_file(
+    path: Path,
+    dt: datetime,
+    is_video_file: bool,
+    logger: logging.Logger,
+    output_dir: Optional[Path],
+    verbose: bool,
+    dry_run: bool,
+    listings: Dict[Path, Set[str]],
+) -> bool:
+    target_path = build_target_path(path, dt, output_dir, is_video_file)
+
+    # Dry runs plan moves too, so they report the same collisions a real run hits.
+    if not plan_move(listings, path, target_path):
         logger.error("Target already exists for %s -> %s", path, target_path)
         return False
 
@@ -258,8 +455,8 @@ def process_file(
         return True
 
     try:
-        target_path.parent.mkdir(parents=True, exist_ok=True)
-        path.rename(target_path)
+        # The target directory is output_dir (created in main) or the source directory.
+        os.rename(os.fspath(path), os.fspath(target_path))
         if verbose:
             print(f"Moved {path} -> {target_path}")
         return True
@@ -277,6 +474,10 @@ def main() -> int:
         print(f"Input directory does not exist or is not a directory: {input_dir}", file=sys.stderr)
         return 1
 
+    if args.jobs < 1:
+        print("--jobs must be at least 1", file=sys.stderr)
+        return 1
+
     if output_dir and not args.dry_run:
         try:
             output_dir.mkdir(parents=True, exist_ok=True)
@@ -293,24 +494,26 @@ def main() -> int:
     log_dir.mkdir(parents=True, exist_ok=True)
     logger = configure_logger(log_path)
 
-    files = list(iter_files(input_dir, output_dir))
-    if not files and args.verbose:
-        print("No files found to process.")
-
     processed = 0
     renamed = 0
-    with exiftool.ExifTool() as et:
-        for file_path in files:
-            processed += 1
-            if process_file(
-                file_path,
-                et,
-                logger,
-                output_dir,
-                args.verbose,
-                args.dry_run,
-            ):
-                renamed += 1
+    # Metadata is read in parallel; renames stay serial in this process.
+    listings: Dict[Path, Set[str]] = {}
+    files = iter_files(input_dir, output_dir, media_only=not args.all_files)
+    for file_path, result in iter_analyzed(files, args.jobs, logger):
+        processed += 1
+        if result and process_file(
+            file_path,
+            *result,
+            logger,
+            output_dir,
+            args.verbose,
+            args.dry_run,
+            listings,
+        ):
+            renamed += 1
+
+    if not processed and args.verbose:
+        print("No files found to process.")
 
     if args.verbose:
         action = "would be renamed" if args.dry_run else "renamed"
@@ -3,7 +3,7 @@ This script looks at the contents of all files in a specified directory tree and
 binary zero bytes (i.e. all bytes are 0x00) to have a .damaged extension added to their filename.
 The extension can be given using the --extension argument, which defaults to .damaged.
 
-Start by reading at most 8 bytes form a file to determine if it is a zero file. If all bytes are zero, read the rest of the file in 1 MiB chunks to confirm it is a zero file.
+Start by reading at most 8 bytes form a file to determine if it is a zero file. If all bytes are zero, read the rest of the file in 4 MiB chunks to confirm it is a zero file.
 If a file is confirmed to be a zero file, rename it by adding the specified extension to the filename.
 
 Usage: python3 rename-zero-files.py <directory> [--extension .damaged]
@@ -14,13 +14,26 @@ The script processes all files in the specified directory and its subdirectories
 from __future__ import annotations
 
 import argparse
+import errno
 import os
 import sys
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import BinaryIO, Deque, Dict, Iterator, Optional, Set, Tuple
 
 HEAD_CHECK_BYTES = 8
-TAIL_CHECK_CHUNK = 1024 * 1024
+TAIL_CHECK_CHUNK = 4 * 1024 * 1024
 DEFAULT_MIN_BYTES = 8
+ZERO_CHUNK = bytes(TAIL_CHECK_CHUNK)
+# Slicing the view is free; comparing a bytearray with it is still a memcmp.
+ZERO_VIEW = memoryview(ZERO_CHUNK)
+HAVE_FADVISE = hasattr(os, "posix_fadvise")
+HAVE_SEEK_DATA = hasattr(os, "SEEK_DATA") and hasattr(os, "SEEK_HOLE")
+DEFAULT_JOBS = min(8, os.cpu_count() or 1)
+
+_read_buffers = threading.local()
 
 
 def eprint(message: str) -> None:
@@ -60,72 +73,214 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Enable verbose output.",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Number of files checked in parallel (default: {DEFAULT_JOBS}).",
+    )
     return parser.parse_args()
 
 
-def is_all_zero(path: Path) -> bool:
+def read_buffer() -> bytearray:
+    """Return this thread's reusable TAIL_CHECK_CHUNK read buffer."""
+    buffer = getattr(_read_buffers, "buffer", None)
+    if buffer is None:
+        buffer = _read_buffers.buffer = bytearray(TAIL_CHECK_CHUNK)
+    return buffer
+
+
+def is_all_zero(path: str, size: int = -1) -> bool:
+    # A file that fits one read is checked with that single read: no head probe,
+    # no extent lookups and no readahead hint.
+    small = 0 <= size <= TAIL_CHECK_CHUNK
     try:
-        with path.open("rb") as handle:
-            head = handle.read(HEAD_CHECK_BYTES)
-            if head and head.count(0) != len(head):
-                return False
-            while True:
-                chunk = handle.read(TAIL_CHECK_CHUNK)
-                if not chunk:
-                    return True
-                if chunk.count(0) != len(chunk):
-                    return False
+        with open(path, "rb", buffering=0) as handle:
+            if HAVE_FADVISE and not small:
+                os.posix_fadvise(handle.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            try:
+                if small:
+                    return read_zero_range(handle, read_buffer(), None)
+                return read_all_zero(handle)
+            finally:
+                if HAVE_FADVISE:
+                    # Scanned once; keep it from evicting the rest of the cache.
+                    os.posix_fadvise(handle.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
     except OSError as exc:
         eprint(f"[warn] Failed to read {path}: {exc}")
         return False
 
 
+def read_all_zero(handle: BinaryIO) -> bool:
+    head = handle.read(HEAD_CHECK_BYTES)
+    if head and head.count(0) != len(head):
+        return False
+    buffer = read_buffer()
+    if not HAVE_SEEK_DATA:
+        return read_zero_range(handle, buffer, None)
+
+    # Holes read as zeros by definition, so only data extents are read.
+    fd = handle.fileno()
+    position = 0
+    while True:
+        try:
+            data_start = os.lseek(fd, position, os.SEEK_DATA)
+            data_end = os.lseek(fd, data_start, os.SEEK_HOLE)
+        except OSError as exc:
+            if exc.errno == errno.ENXIO:
+                # No data past position; a fully sparse file ends up here without a read.
+                return True
+            if exc.errno == errno.EINVAL and position == 0:
+                # Filesystem without SEEK_DATA support.
+                handle.seek(0)
+                return read_zero_range(handle, buffer, None)
+            raise
+        handle.seek(data_start)
+        if not read_zero_range(handle, buffer, data_end - data_start):
+            return False
+        position = data_end
+
+
+def read_zero_range(handle: BinaryIO, buffer: bytearray, length: Optional[int]) -> bool:
+    """Read `length` bytes (or to end of file if None) and report whether all are zero."""
+    view = memoryview(buffer)
+    remaining = length
+    while remaining is None or remaining > 0:
+        want = TAIL_CHECK_CHUNK if remaining is None else min(remaining, TAIL_CHECK_CHUNK)
+        count = handle.readinto(view[:want])
+        if not count:
+            return True
+        # Compare against a zero buffer: memcmp stops at the first non-zero byte.
+        if count == TAIL_CHECK_CHUNK:
+            if buffer != ZERO_CHUNK:
+                return False
+        elif buffer[:count] != ZERO_VIEW[:count]:
+            return False
+        if remaining is not None:
+            remaining -= count
+    return True
+
+
+def iter_files(directory: str) -> Iterator[os.DirEntry]:
+    """
+    Yield the non-directory entries under directory in os.walk order (top-down,
+    sorted by name, symlinked directories not followed). Entries carry cached type
+    and stat information, so no Path is built per file.
+    """
+    stack = [directory]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as iterator:
+                entries = sorted(iterator, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                if not entry.is_symlink():
+                    subdirs.append(entry.path)
+                continue
+            yield entry
+        stack.extend(reversed(subdirs))
+
+
+def claim_target_name(listings: Dict[str, Set[str]], root: str, name: str, target_name: str) -> bool:
+    """
+    Claim target_name in root for the file `name`; False if the name is taken.
+    Each directory is listed once and then tracks planned moves, instead of a stat
+    per target. Names are casefolded, so a target differing only in case from an
+    existing file counts as taken: os.rename would replace it on case-insensitive media.
+    """
+    names = listings.get(root)
+    if names is None:
+        try:
+            names = listings[root] = {entry.casefold() for entry in os.listdir(root)}
+        except OSError:
+            names = listings[root] = set()
+    target_key = target_name.casefold()
+    if target_key in names:
+        return False
+    names.add(target_key)
+    names.discard(name.casefold())
+    return True
+
+
 def rename_zero_files(
     base_path: Path,
     extension: str,
     dry_run: bool,
     verbose: bool,
     min_bytes: int,
+    jobs: int = DEFAULT_JOBS,
 ) -> int:
     renamed = 0
-    for root, dirnames, filenames in os.walk(base_path):
-        dirnames.sort()
-        filenames.sort()
-        for name in filenames:
-            path = Path(root) / name
-            if not path.is_file():
-                continue
-            try:
-                size = path.stat().st_size
-            except OSError as exc:
-                eprint(f"[warn] Failed to stat {path}: {exc}")
-                continue
-            if size <= min_bytes:
-                if verbose:
-                    eprint(f"[info] Skipping {path} ({size} bytes) under or equal to {min_bytes} bytes.")
-                continue
-            if extension and name.endswith(extension):
-                if verbose:
-                    eprint(f"[info] Skipping already tagged {path}")
-                continue
-            if not is_all_zero(path):
-                if verbose:
-                    eprint(f"[info] Skipping non-zero {path}")
-                continue
-            target = path.with_name(f"{name}{extension}")
-            if target.exists():
-                eprint(f"[warn] Target exists, skipping {path}")
-                continue
-            if dry_run:
-                print(f"[DRY RUN] {path} -> {target}")
-                continue
+    max_pending = jobs * 4
+    # Files in walk order: (path, name, zero check future), or no future and a skip message.
+    pending: Deque[Tuple[Optional[str], str, Optional[Future], str]] = deque()
+    listings: Dict[str, Set[str]] = {}
+
+    def finish(
+        path: Optional[str], name: str, future: Optional[Future], skip_message: str
+    ) -> None:
+        nonlocal renamed
+        if path is None or future is None:
+            if skip_message:
+                eprint(skip_message)
+            return
+        if not future.result():
+            if verbose:
+                eprint(f"[info] Skipping non-zero {path}")
+            return
+        # path ends in name, so appending the extension renames within the directory.
+        target_name = f"{name}{extension}"
+        target = f"{path}{extension}"
+        if not claim_target_name(listings, os.path.dirname(path), name, target_name):
+            eprint(f"[warn] Target exists, skipping {path}")
+            return
+        if dry_run:
+            print(f"[DRY RUN] {path} -> {target}")
+            return
+        try:
+            os.rename(path, target)
+            renamed += 1
+            if verbose:
+                eprint(f"[info] Renamed {path} -> {target}")
+        except OSError as exc:
+            eprint(f"[error] Failed to rename {path} to {target}: {exc}")
+
+    # Files are scanned on the pool; results are handled in walk order, renames here.
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for entry in iter_files(str(base_path)):
+            name = entry.name
             try:
-                path.rename(target)
-                renamed += 1
-                if verbose:
-                    eprint(f"[info] Renamed {path} -> {target}")
+                if not entry.is_file():
+                    continue
+                size = entry.stat().st_size
             except OSError as exc:
-                eprint(f"[error] Failed to rename {path} to {target}: {exc}")
+                pending.append((None, name, None, f"[warn] Failed to stat {entry.path}: {exc}"))
+            else:
+                # Silent skips never enter the queue; messages are only built when verbose.
+                if size <= min_bytes:
+                    if not verbose:
+                        continue
+                    message = f"[info] Skipping {entry.path} ({size} bytes) under or equal to {min_bytes} bytes."
+                    pending.append((None, name, None, message))
+                elif extension and name.endswith(extension):
+                    if not verbose:
+                        continue
+                    pending.append((None, name, None, f"[info] Skipping already tagged {entry.path}"))
+                else:
+                    path = entry.path
+                    pending.append((path, name, executor.submit(is_all_zero, path, size), ""))
+            if len(pending) >= max_pending:
+                finish(*pending.popleft())
+        while pending:
+            finish(*pending.popleft())
     return renamed
 
 
@@ -138,7 +293,12 @@ def main() -> int:
     if args.min_bytes < 0:
         eprint("Minimum bytes must be zero or greater.")
         return 1
-    rename_zero_files(base_path, args.extension, args.dry_run, args.verbose, args.min_bytes)
+    if args.jobs < 1:
+        eprint("Jobs must be a positive integer.")
+        return 1
+    rename_zero_files(
+        base_path, args.extension, args.dry_run, args.verbose, args.min_bytes, args.jobs
+    )
     return 0
 
 
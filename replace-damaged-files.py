@@ -44,11 +44,20 @@ Keep this text in the file but do not use it directly in the help section.
 from __future__ import annotations
 
 import argparse
+import errno
 import os
 import shutil
 import sys
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Iterable, Optional, Set, Tuple
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows.
+    fcntl = None
 
 
 def eprint(message: str) -> None:
@@ -68,10 +77,40 @@ EQUIVALENT_EXTENSION_GROUPS: Tuple[Tuple[str, ...], ...] = (
     (".mp4", ".m4v"),
     (".mov", ".qt"),
 )
-EXTENSION_EQUIVALENTS: Dict[str, Tuple[str, ...]] = {
-    ext: group for group in EQUIVALENT_EXTENSION_GROUPS for ext in group
+# Every extension in a group maps to the group's first entry.
+CANONICAL_SUFFIX: Dict[str, str] = {
+    ext: group[0] for group in EQUIVALENT_EXTENSION_GROUPS for ext in group
 }
 
+# Linux ioctl that makes the target share the source's extents (btrfs, XFS, ...).
+FICLONE = (
+    getattr(fcntl, "FICLONE", 0x40049409)
+    if fcntl is not None and sys.platform.startswith("linux")
+    else None
+)
+HAVE_COPY_FILE_RANGE = hasattr(os, "copy_file_range")
+COPY_CHUNK_SIZE = 64 * 1024 * 1024
+DEFAULT_JOBS = min(8, os.cpu_count() or 1)
+COPY_RANGE_UNSUPPORTED = {
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOSYS,
+    getattr(errno, "EOPNOTSUPP", errno.EINVAL),
+}
+# os.link failures that fall back to copying.
+LINK_UNSUPPORTED = {
+    errno.EXDEV,
+    errno.EEXIST,
+    errno.EPERM,
+    errno.EMLINK,
+    getattr(errno, "EOPNOTSUPP", errno.EINVAL),
+}
+
+# size -> extension key -> candidate paths, kept in table order (dict as ordered set).
+# Paths are plain strings: a table can hold millions of entries, and a str costs a
+# fraction of a Path with its cached parts.
+SizeMapping = Dict[int, Dict[str, Dict[str, None]]]
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -103,26 +142,60 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Show what would be changed without writing files.",
     )
+    parser.add_argument(
+        "--hardlink",
+        action="store_true",
+        help="Hard-link the matched file into place instead of copying it when both are "
+        "on the same filesystem. The restored file then shares data and metadata with "
+        "the matched file.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Directories listed and files replaced in parallel (default: {DEFAULT_JOBS}).",
+    )
     return parser.parse_args()
 
 
-def normalize_relative_path(rel_path: str) -> Optional[Path]:
+def normalize_relative_path(rel_path: str) -> Optional[str]:
+    """
+    Clean a table path the way Path would (no empty or "." parts), without building
+    one per line. Returns None for absolute paths and paths that climb with "..".
+    """
     cleaned = rel_path.strip().replace("\\", "/")
-    if not cleaned:
-        return None
-    path = Path(cleaned)
-    if path.is_absolute():
+    if not cleaned or cleaned.startswith("/"):
         return None
-    if any(part == ".." for part in path.parts):
+    parts = cleaned.split("/")
+    if "" in parts or "." in parts:
+        parts = [part for part in parts if part and part != "."]
+    if ".." in parts:
         return None
-    return path
+    return "/".join(parts) or "."
+
 
+def path_suffix(path: str) -> str:
+    """Suffix of the last component of a "/"-separated path, by the rules of Path.suffix."""
+    name = path[path.rfind("/") + 1 :]
+    dot = name.rfind(".")
+    return name[dot:] if 0 < dot < len(name) - 1 else ""
 
-def load_size_mapping(table_paths: Iterable[Path]) -> Dict[int, Set[Path]]:
-    mapping: Dict[int, Set[Path]] = {}
+
+@lru_cache(maxsize=None)
+def extension_key(extension: str) -> str:
+    """Lowercased extension, with equivalent extensions mapped to one shared key."""
+    ext_lower = extension.lower()
+    return CANONICAL_SUFFIX.get(ext_lower, ext_lower)
+
+
+def load_size_mapping(table_paths: Iterable[Path]) -> SizeMapping:
+    mapping: SizeMapping = {}
     for table_path in table_paths:
+        table_dir = str(table_path.parent)
         try:
-            with table_path.open("r", encoding="utf-8") as handle:
+            # Tables written from non-UTF-8 names carry those bytes; keep them as they are.
+            with table_path.open("r", encoding="utf-8", errors="surrogateescape") as handle:
                 for line_no, line in enumerate(handle, 1):
                     stripped = line.strip()
                     if not stripped or stripped.startswith("#"):
@@ -143,104 +216,217 @@ def load_size_mapping(table_paths: Iterable[Path]) -> Dict[int, Set[Path]]:
                     if normalized is None:
                         eprint(f"[warn] {table_path}:{line_no}: invalid relative path: {rel_path}")
                         continue
-                    candidate_path = table_path.parent / normalized
-                    mapping.setdefault(size, set()).add(candidate_path)
+                    candidate_path = os.path.join(table_dir, normalized)
+                    by_extension = mapping.setdefault(size, {})
+                    by_extension.setdefault(extension_key(path_suffix(normalized)), {})[candidate_path] = None
         except OSError as exc:
             eprint(f"[error] Failed to read {table_path}: {exc}")
     return mapping
 
 
-def iter_damaged_files(base_path: Path, extension: str) -> Iterable[Path]:
-    for root, dirnames, filenames in os.walk(base_path):
-        dirnames.sort()
-        filenames.sort()
-        for name in filenames:
-            if extension and not name.endswith(extension):
-                continue
-            yield Path(root) / name
-
-
-def remove_extension(path: Path, extension: str) -> Path:
-    if extension and path.name.endswith(extension):
-        return path.with_name(path.name[: -len(extension)])
-    return path
-
-
-def equivalent_extensions(extension: str) -> Set[str]:
-    if not extension:
-        return {""}
-    ext_lower = extension.lower()
-    group = EXTENSION_EQUIVALENTS.get(ext_lower)
-    if not group:
-        return {ext_lower}
-    return set(group)
-
-
-def extensions_compatible(ext_a: str, ext_b: str) -> bool:
-    return ext_b.lower() in equivalent_extensions(ext_a)
+def scan_directory(directory: str, extension: str) -> Tuple[List[os.DirEntry], List[str]]:
+    """
+    List one directory: entries of files named *extension and subdirectory paths,
+    both sorted by name. Runs on a worker thread; matching entries are stat'ed here
+    so the cached result is ready when the main thread asks for the size.
+    """
+    try:
+        with os.scandir(directory) as iterator:
+            entries = sorted(iterator, key=lambda e: e.name)
+    except OSError:
+        return [], []
+
+    files: List[os.DirEntry] = []
+    subdirs: List[str] = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            if not entry.is_symlink():
+                subdirs.append(entry.path)
+            continue
+        if extension and not entry.name.endswith(extension):
+            continue
+        try:
+            entry.stat()
+        except OSError:
+            # Not cached; the caller's stat raises again and reports it.
+            pass
+        files.append(entry)
+    return files, subdirs
+
+
+def iter_damaged_files(
+    base_path: Path, extension: str, jobs: int = DEFAULT_JOBS
+) -> Iterator[os.DirEntry]:
+    """
+    Yield entries of files named *extension in os.walk order (top-down, sorted by
+    name, symlinked directories not followed), using os.scandir directly.
+    The next directories in visiting order are listed ahead on a thread pool, so
+    per-directory read latency overlaps while the output order stays fixed.
+    """
+    max_pending = jobs * 2
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        # Directories still to visit, last one next; each holds its listing future once submitted.
+        stack: List[List] = [[str(base_path), None]]
+        pending = 0
+        while stack:
+            index = len(stack) - 1
+            while pending < max_pending and index >= 0:
+                entry = stack[index]
+                if entry[1] is None:
+                    entry[1] = executor.submit(scan_directory, entry[0], extension)
+                    pending += 1
+                index -= 1
+
+            _, future = stack.pop()
+            pending -= 1
+            files, subdirs = future.result()
+            yield from files
+            stack.extend([path, None] for path in reversed(subdirs))
+
+
+def split_damaged_name(name: str, extension: str) -> Tuple[str, str]:
+    """
+    Return (restored name, its suffix) for a damaged file name in one pass over the
+    string; the suffix follows the same rules as Path.suffix.
+    """
+    stem = name[: -len(extension)] if extension and name.endswith(extension) else name
+    return stem, path_suffix(stem)
+
+
+def copy_file(source: str, target: str) -> None:
+    """
+    Copy source over target. A reflink clone copies no data at all; otherwise
+    copy_file_range copies inside the kernel. shutil.copyfile is the fallback.
+    """
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        if FICLONE is not None:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return
+            except OSError:
+                pass
+        if HAVE_COPY_FILE_RANGE:
+            copied = 0
+            try:
+                while True:
+                    count = os.copy_file_range(src.fileno(), dst.fileno(), COPY_CHUNK_SIZE)
+                    if count == 0:
+                        return
+                    copied += count
+            except OSError as exc:
+                if copied or exc.errno not in COPY_RANGE_UNSUPPORTED:
+                    raise
+    shutil.copyfile(source, target)
+
+
+def link_file(candidate: str, damaged_path: str, target_path: str) -> bool:
+    """
+    Hard-link candidate as target_path and drop the damaged file; no data is copied.
+    Returns False when a link cannot be made here (other filesystem, existing target).
+    """
+    try:
+        os.link(candidate, target_path)
+    except OSError as exc:
+        if exc.errno in LINK_UNSUPPORTED:
+            return False
+        raise
+    os.unlink(damaged_path)
+    return True
+
+
+def replace_file(
+    candidate: str, damaged_path: str, target_path: str, hardlink: bool = False
+) -> None:
+    if hardlink and link_file(candidate, damaged_path, target_path):
+        return
+    copy_file(candidate, damaged_path)
+    os.replace(damaged_path, target_path)
+
+
+def existing_candidates(candidates: List[str]) -> List[str]:
+    return [candidate for candidate in candidates if os.path.exists(candidate)]
 
 
 def process_damaged_files(
     base_path: Path,
-    size_mapping: Dict[int, Set[Path]],
+    size_mapping: SizeMapping,
     extension: str,
     dry_run: bool,
     verbose: bool,
+    jobs: int = DEFAULT_JOBS,
+    hardlink: bool = False,
 ) -> int:
     replaced = 0
-    for damaged_path in iter_damaged_files(base_path, extension):
-        try:
-            damaged_size = damaged_path.stat().st_size
-        except OSError as exc:
-            eprint(f"[warn] Failed to stat {damaged_path}: {exc}")
-            continue
-
-        candidates = size_mapping.get(damaged_size)
-        if not candidates:
-            continue
-
-        target_path = remove_extension(damaged_path, extension)
-        target_ext = target_path.suffix.lower()
-        matched_extension = False
-        matched_candidate = None
-        matched_candidates = [] if dry_run else None
-
-        for candidate in candidates:
-            candidate_path = candidate
-            if not extensions_compatible(target_ext, candidate_path.suffix.lower()):
-                continue
-            matched_extension = True
-            if dry_run:
-                matched_candidates.append(candidate_path)
-                continue
-            matched_candidate = candidate_path
-            break
+    max_pending = jobs * 4
+    # Matched files in walk order: (damaged path, target path, copy or lookup future);
+    # no future marks an extension mismatch.
+    pending: Deque[Tuple[str, str, Optional[Future]]] = deque()
 
-        if not matched_extension:
-            if verbose:
-                print(f"[info] Size match but extension mismatch: {damaged_path} (matched candidate: {matched_candidate})")
-            continue
+    def finish(damaged_path: str, target_path: str, future: Optional[Future]) -> None:
+        nonlocal replaced
+        if future is None:
+            print(f"[info] Size match but extension mismatch: {damaged_path} (matched candidate: None)")
+            return
 
         if dry_run:
             print()
             print(f"DAM: {damaged_path}")
-            for candidate_path in matched_candidates:
-                if not candidate_path.exists():
-                    continue
+            for candidate_path in future.result():
                 print(f"CAN: {candidate_path}")
             replaced += 1
-            continue
+            return
 
         try:
-            target_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copyfile(matched_candidate, damaged_path)
-            damaged_path.replace(target_path)
+            future.result()
             replaced += 1
             if verbose:
                 print(f"[info] Replaced {damaged_path} -> {target_path}")
         except OSError as exc:
             eprint(f"[error] Failed to replace {target_path} using {damaged_path}: {exc}")
 
+    # Copies (or dry-run existence checks) run on the pool; output stays in walk order.
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for entry in iter_damaged_files(base_path, extension, jobs):
+            try:
+                damaged_size = entry.stat().st_size
+            except OSError as exc:
+                eprint(f"[warn] Failed to stat {entry.path}: {exc}")
+                continue
+
+            by_extension = size_mapping.get(damaged_size)
+            if not by_extension:
+                continue
+
+            target_name, suffix = split_damaged_name(entry.name, extension)
+            if not target_name:
+                continue
+            damaged_path = entry.path
+            # The restored file sits next to the damaged one, under the stripped name.
+            target_path = damaged_path[: len(damaged_path) - len(entry.name)] + target_name
+            # Only candidates with a compatible extension are looked at.
+            candidates = by_extension.get(extension_key(suffix))
+            if not candidates:
+                if verbose:
+                    pending.append((damaged_path, target_path, None))
+            elif dry_run:
+                future = executor.submit(existing_candidates, list(candidates))
+                pending.append((damaged_path, target_path, future))
+            else:
+                matched_candidate = next(iter(candidates))
+                future = executor.submit(
+                    replace_file, matched_candidate, damaged_path, target_path, hardlink
+                )
+                pending.append((damaged_path, target_path, future))
+
+            if len(pending) >= max_pending:
+                finish(*pending.popleft())
+        while pending:
+            finish(*pending.popleft())
+
     return replaced
 
 
@@ -251,6 +437,10 @@ def main() -> int:
         eprint(f"Base path is not a directory: {base_path}")
         return 1
 
+    if args.jobs < 1:
+        eprint("Jobs must be a positive integer.")
+        return 1
+
     table_paths = [Path(p).expanduser().resolve() for p in args.filesizes]
     for table_path in table_paths:
         if not table_path.is_file():
@@ -268,6 +458,8 @@ def main() -> int:
         extension=args.extension,
         dry_run=args.dry_run,
         verbose=args.verbose,
+        jobs=args.jobs,
+        hardlink=args.hardlink,
     )
     return 0
 
@@ -28,8 +28,11 @@ import argparse
 import hashlib
 import os
 import sys
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, Optional, TextIO, Tuple
+from typing import BinaryIO, Deque, Dict, Iterator, List, Optional, Set, Tuple
 
 HASH_FILE_NAME = "hashes.txt"
 SIZE_FILE_NAME = "filesizes.txt"
@@ -37,6 +40,14 @@ HEAD_CHECK_BYTES = 8
 TAIL_CHECK_CHUNK = 1024 * 1024
 HASH_CHUNK_SIZE = 8 * 1024 * 1024
 DEFAULT_MIN_BYTES = 8
+DEFAULT_JOBS = min(8, os.cpu_count() or 1)
+WRITE_BUFFER_SIZE = 1024 * 1024
+HAVE_FADVISE = hasattr(os, "posix_fadvise")
+ZERO_CHUNK = bytes(TAIL_CHECK_CHUNK)
+# Slicing the view is free; comparing a bytearray with it is still a memcmp.
+ZERO_VIEW = memoryview(ZERO_CHUNK)
+
+_read_buffers = threading.local()
 
 
 def eprint(message: str) -> None:
@@ -84,57 +95,186 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Truncate renamed damaged files to zero bytes while preserving timestamps.",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Directories listed and files hashed in parallel (default: {DEFAULT_JOBS}).",
+    )
     return parser.parse_args()
 
 
-def iter_files(base_path: Path) -> Iterable[Path]:
-    for root, dirnames, filenames in os.walk(base_path):
-        for name in filenames:
-            yield Path(root) / name
-
-
-def inspect_file(path: Path) -> Tuple[bool, bool, Optional[str]]:
+def scan_directory(directory: str) -> Tuple[List[os.DirEntry], List[str]]:
+    """
+    List one directory: file entries and subdirectory paths in os.scandir order.
+    Runs on a worker thread; files are stat'ed here so the main thread reads the
+    cached result from the entry.
+    """
     try:
-        with path.open("rb", buffering=0) as handle:
+        with os.scandir(directory) as iterator:
+            entries = list(iterator)
+    except OSError:
+        return [], []
+
+    files: List[os.DirEntry] = []
+    subdirs: List[str] = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            # Like os.walk: symlinked directories are neither walked nor listed.
+            if not entry.is_symlink():
+                subdirs.append(entry.path)
+            continue
+        try:
+            entry.stat()
+        except OSError:
+            # Not cached; the caller's stat raises again and reports it.
+            pass
+        files.append(entry)
+    return files, subdirs
+
+
+def iter_files(base_path: Path, jobs: int = DEFAULT_JOBS) -> Iterator[os.DirEntry]:
+    """
+    Yield an entry for every file under base_path in the same top-down order as
+    os.walk, with its stat already cached.
+    The next directories in visiting order are listed ahead on a thread pool, so
+    per-directory read latency overlaps while the output order stays fixed.
+    """
+    max_pending = jobs * 2
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        # Directories still to visit, last one next; each holds its listing future once submitted.
+        stack: List[List] = [[str(base_path), None]]
+        pending = 0
+        while stack:
+            index = len(stack) - 1
+            while pending < max_pending and index >= 0:
+                entry = stack[index]
+                if entry[1] is None:
+                    entry[1] = executor.submit(scan_directory, entry[0])
+                    pending += 1
+                index -= 1
+
+            _, future = stack.pop()
+            pending -= 1
+            files, subdirs = future.result()
+            yield from files
+            stack.extend([path, None] for path in reversed(subdirs))
+
+
+def read_buffer() -> memoryview:
+    """Return this thread's reusable HASH_CHUNK_SIZE read buffer."""
+    view = getattr(_read_buffers, "view", None)
+    if view is None:
+        view = _read_buffers.view = memoryview(bytearray(HASH_CHUNK_SIZE))
+    return view
+
+
+def zero_check_buffer() -> bytearray:
+    """Return this thread's reusable TAIL_CHECK_CHUNK buffer for the zero scan."""
+    buffer = getattr(_read_buffers, "zero_buffer", None)
+    if buffer is None:
+        buffer = _read_buffers.zero_buffer = bytearray(TAIL_CHECK_CHUNK)
+    return buffer
+
+
+def hash_rest(handle: BinaryIO, digest: hashlib._Hash) -> str:
+    """Feed the rest of handle to digest through the reused buffer; return the hex digest."""
+    view = read_buffer()
+    while True:
+        count = handle.readinto(view)
+        if not count:
+            break
+        digest.update(view[:count])
+    return digest.hexdigest()
+
+
+def inspect_file(path: str, size: int = -1) -> Tuple[bool, Optional[str]]:
+    """
+    Return (all_zero, digest) for path; digest is None for an all-zero file.
+    Runs on a worker thread: file reads and SHA-256 updates release the GIL.
+    Read errors propagate so the caller reports them in walk order.
+    """
+    with open(path, "rb", buffering=0) as handle:
+        if HAVE_FADVISE and size > TAIL_CHECK_CHUNK:
+            # Larger files are read front to back once; let the kernel read further ahead.
+            os.posix_fadvise(handle.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        try:
             head = handle.read(HEAD_CHECK_BYTES)
-            if head and head.count(0) != len(head):
-                digest = hashlib.sha256()
-                digest.update(head)
-                for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b""):
-                    digest.update(chunk)
-                return True, False, digest.hexdigest()
-
             digest = hashlib.sha256()
             digest.update(head)
-            all_zero = True
+            if head and head.count(0) != len(head):
+                return False, hash_rest(handle, digest)
+
+            # Zero chunks are only counted: an all-zero file is never hashed, and for a
+            # file with a zero prefix the prefix is hashed from ZERO_CHUNK afterwards.
+            buffer = zero_check_buffer()
+            zero_bytes = 0
             while True:
-                chunk = handle.read(TAIL_CHECK_CHUNK)
-                if not chunk:
+                count = handle.readinto(buffer)
+                if not count:
+                    return True, None
+                # Compare against a zero buffer: memcmp stops at the first non-zero byte.
+                if count == TAIL_CHECK_CHUNK:
+                    if buffer != ZERO_CHUNK:
+                        break
+                elif buffer[:count] != ZERO_VIEW[:count]:
                     break
-                if all_zero and chunk.count(0) != len(chunk):
-                    all_zero = False
-                    digest.update(chunk)
-                    for rest in iter(lambda: handle.read(HASH_CHUNK_SIZE), b""):
-                        digest.update(rest)
-                    return True, False, digest.hexdigest()
-                digest.update(chunk)
-            return True, True, None
-    except OSError as exc:
-        eprint(f"[warn] Failed to read {path}: {exc}")
-        return False, False, None
+                zero_bytes += count
+
+            while zero_bytes:
+                length = min(zero_bytes, TAIL_CHECK_CHUNK)
+                digest.update(ZERO_VIEW[:length])
+                zero_bytes -= length
+            digest.update(memoryview(buffer)[:count])
+            return False, hash_rest(handle, digest)
+        finally:
+            if HAVE_FADVISE:
+                # Read once and never again; keep it from evicting the rest of the cache.
+                os.posix_fadvise(handle.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
 
 
 def write_entry(
     size: int,
     digest: str,
     rel_path: str,
-    size_writer: Optional[TextIO],
-    hash_writer: Optional[TextIO],
+    size_buffer: bytearray,
+    hash_buffer: bytearray,
 ) -> None:
-    if size_writer is not None:
-        size_writer.write(f"{size} {rel_path}\n")
-    if hash_writer is not None:
-        hash_writer.write(f"{digest} {rel_path}\n")
+    encoded = rel_path.encode("utf-8", "surrogateescape")
+    size_buffer += b"%d %s\n" % (size, encoded)
+    hash_buffer += b"%s %s\n" % (digest.encode("ascii"), encoded)
+
+
+def write_all(fd: int, data: bytearray) -> None:
+    written = 0
+    while written < len(data):
+        written += os.write(fd, data[written:])
+
+
+def claim_target_name(listings: Dict[str, Set[str]], root: str, name: str, target_name: str) -> bool:
+    """
+    Claim target_name in root for the file `name`; False if the name is taken.
+    Each directory is listed once and then tracks planned moves, instead of a stat
+    per target. Names are casefolded, so a target differing only in case from an
+    existing file counts as taken: os.rename would replace it on case-insensitive media.
+    """
+    names = listings.get(root)
+    if names is None:
+        try:
+            names = listings[root] = {entry.casefold() for entry in os.listdir(root)}
+        except OSError:
+            names = listings[root] = set()
+    target_key = target_name.casefold()
+    if target_key in names:
+        return False
+    names.add(target_key)
+    names.discard(name.casefold())
+    return True
 
 
 def process_files(
@@ -145,48 +285,71 @@ def process_files(
     verbose: bool,
     skip_rename: bool,
     truncate_damaged_files: bool,
-    size_writer: Optional[TextIO],
-    hash_writer: Optional[TextIO],
+    size_fd: Optional[int],
+    hash_fd: Optional[int],
+    jobs: int = DEFAULT_JOBS,
 ) -> None:
-    size_path = base_path / SIZE_FILE_NAME
-    hash_path = base_path / HASH_FILE_NAME
-
-    for path in iter_files(base_path):
-        if path == size_path or path == hash_path:
-            continue
-
+    size_path = str(base_path / SIZE_FILE_NAME)
+    hash_path = str(base_path / HASH_FILE_NAME)
+    # os.path.join(base, "") appends exactly one separator, even for a root directory.
+    prefix_len = len(os.path.join(str(base_path), ""))
+    max_pending = jobs * 4
+    # Table lines are collected and written with one os.write per WRITE_BUFFER_SIZE bytes.
+    size_buffer = bytearray()
+    hash_buffer = bytearray()
+    # Files in walk order: (entry, stat result, inspect future), or no future and a stat warning.
+    pending: Deque[Tuple[os.DirEntry, Optional[os.stat_result], Optional[Future], str]] = deque()
+    listings: Dict[str, Set[str]] = {}
+
+    def flush() -> None:
+        if size_fd is not None:
+            write_all(size_fd, size_buffer)
+        if hash_fd is not None:
+            write_all(hash_fd, hash_buffer)
+        size_buffer.clear()
+        hash_buffer.clear()
+
+    def finish(
+        entry: os.DirEntry,
+        stat_info: Optional[os.stat_result],
+        future: Optional[Future],
+        warning: str,
+    ) -> None:
+        if stat_info is None or future is None:
+            eprint(warning)
+            return
+        # Paths stay strings from the walk; no Path is built per file.
+        path = entry.path
         try:
-            stat_info = path.stat()
+            all_zero, digest = future.result()
         except OSError as exc:
-            eprint(f"[warn] Failed to stat {path}: {exc}")
-            continue
+            eprint(f"[warn] Failed to read {path}: {exc}")
+            return
         size = stat_info.st_size
 
-        already_tagged = bool(extension) and path.name.endswith(extension)
-
-        ok, all_zero, digest = inspect_file(path)
-        if not ok:
-            continue
+        already_tagged = bool(extension) and entry.name.endswith(extension)
 
         if all_zero:
             if skip_rename:
                 if verbose:
                     eprint(f"[info] Skipping rename for zero file {path}")
-                continue
+                return
             if size >= min_bytes and not already_tagged:
-                target = path.with_name(f"{path.name}{extension}")
-                if target.exists():
+                # path ends in the file name, so appending renames within the directory.
+                name = entry.name
+                target_name = f"{name}{extension}"
+                target = f"{path}{extension}"
+                if not claim_target_name(listings, os.path.dirname(path), name, target_name):
                     eprint(f"[warn] Target exists, skipping {path}")
-                    continue
+                    return
                 if dry_run:
                     print(f"[DRY RUN] {path} -> {target}")
                 else:
                     try:
-                        path.rename(target)
+                        os.rename(path, target)
                         if truncate_damaged_files:
                             try:
-                                with target.open("r+b") as handle:
-                                    handle.truncate(0)
+                                os.truncate(target, 0)
                                 os.utime(
                                     target,
                                     ns=(stat_info.st_atime_ns, stat_info.st_mtime_ns),
@@ -199,25 +362,46 @@ def process_files(
                             eprint(f"[info] Renamed {path} -> {target}")
                     except OSError as exc:
                         eprint(f"[error] Failed to rename {path} to {target}: {exc}")
-            continue
+            return
 
         if digest is None:
-            continue
+            return
 
-        rel_path = path.relative_to(base_path).as_posix()
+        rel_path = path[prefix_len:]
+        if os.sep != "/":
+            rel_path = rel_path.replace(os.sep, "/")
         if dry_run:
             if verbose:
                 eprint(f"[info] Would record {rel_path}")
-            continue
-        try:
-            write_entry(size, digest, rel_path, size_writer, hash_writer)
-        except OSError as exc:
-            eprint(f"[error] Failed to write entry for {path}: {exc}")
-            continue
+            return
+        write_entry(size, digest, rel_path, size_buffer, hash_buffer)
+        if len(hash_buffer) >= WRITE_BUFFER_SIZE:
+            flush()
 
         if verbose:
             eprint(f"[info] Recorded {rel_path} ({size} bytes)")
 
+    # Files are read and hashed on the pool; renames and table writes happen here, in walk order.
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for entry in iter_files(base_path, jobs):
+            if entry.path == size_path or entry.path == hash_path:
+                continue
+
+            # The walk stat'ed the file already; this reads the entry's cached result.
+            try:
+                stat_info = entry.stat()
+            except OSError as exc:
+                pending.append((entry, None, None, f"[warn] Failed to stat {entry.path}: {exc}"))
+            else:
+                future = executor.submit(inspect_file, entry.path, stat_info.st_size)
+                pending.append((entry, stat_info, future, ""))
+            if len(pending) >= max_pending:
+                finish(*pending.popleft())
+        while pending:
+            finish(*pending.popleft())
+    if hash_buffer:
+        flush()
+
 
 def main() -> int:
     args = parse_args()
@@ -228,6 +412,9 @@ def main() -> int:
     if args.min_bytes < 0:
         eprint("Minimum bytes must be zero or greater.")
         return 1
+    if args.jobs < 1:
+        eprint("Jobs must be a positive integer.")
+        return 1
 
     size_path = base_path / SIZE_FILE_NAME
     hash_path = base_path / HASH_FILE_NAME
@@ -247,14 +434,15 @@ def main() -> int:
             verbose=args.verbose,
             skip_rename=args.skip_rename,
             truncate_damaged_files=args.truncate_damaged_files,
-            size_writer=None,
-            hash_writer=None,
+            size_fd=None,
+            hash_fd=None,
+            jobs=args.jobs,
         )
         return 0
 
     try:
-        with size_path.open("w", encoding="utf-8", newline="\n") as size_writer, hash_path.open(
-            "w", encoding="utf-8", newline="\n"
+        with size_path.open("wb", buffering=0) as size_writer, hash_path.open(
+            "wb", buffering=0
         ) as hash_writer:
             process_files(
                 base_path=base_path,
@@ -264,11 +452,12 @@ def main() -> int:
                 verbose=args.verbose,
                 skip_rename=args.skip_rename,
                 truncate_damaged_files=args.truncate_damaged_files,
-                size_writer=size_writer,
-                hash_writer=hash_writer,
+                size_fd=size_writer.fileno(),
+                hash_fd=hash_writer.fileno(),
+                jobs=args.jobs,
             )
     except OSError as exc:
-        eprint(f"[error] Failed to open output files: {exc}")
+        eprint(f"[error] Failed to write output files: {exc}")
         return 1
 
     return 0
@@ -13,8 +13,12 @@ from __future__ import annotations
 import argparse
 import os
 import sys
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import Deque, Iterator, List, Optional, Tuple
+
+DEFAULT_JOBS = min(8, os.cpu_count() or 1)
 
 
 def eprint(message: str) -> None:
@@ -46,40 +50,85 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Show what would be truncated without writing files.",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Directories listed and files truncated in parallel (default: {DEFAULT_JOBS}).",
+    )
     return parser.parse_args()
 
 
-def iter_damaged_files(base_path: Path, extension: str) -> Iterable[Path]:
-    for root, _, filenames in os.walk(base_path):
-        for name in filenames:
-            if extension and not name.endswith(extension):
-                continue
-            yield Path(root) / name
-
-
-def truncate_file(path: Path, dry_run: bool, verbose: bool) -> Tuple[bool, int]:
-    try:
-        stat_info = path.stat()
-    except OSError as exc:
-        eprint(f"[warn] Failed to stat {path}: {exc}")
-        return False, 0
-
-    size = stat_info.st_size
-    if dry_run:
-        print(f"[DRY RUN] {path} ({size} bytes)")
-        return True, size
-
+def scan_directory(directory: str, extension: str) -> Tuple[List[os.DirEntry], List[str]]:
+    """
+    List one directory: entries of files named *extension and subdirectory paths,
+    in os.scandir order. Runs on a worker thread; matching files are stat'ed here
+    so the main thread reads the cached result from the entry.
+    """
     try:
-        with path.open("r+b") as handle:
-            handle.truncate(0)
-        os.utime(path, ns=(stat_info.st_atime_ns, stat_info.st_mtime_ns))
-    except OSError as exc:
-        eprint(f"[error] Failed to truncate {path}: {exc}")
-        return False, 0
-
-    if verbose:
-        eprint(f"[info] Truncated {path} ({size} bytes)")
-    return True, size
+        with os.scandir(directory) as iterator:
+            entries = list(iterator)
+    except OSError:
+        return [], []
+
+    files: List[os.DirEntry] = []
+    subdirs: List[str] = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            # Like os.walk: symlinked directories are neither walked nor listed.
+            if not entry.is_symlink():
+                subdirs.append(entry.path)
+            continue
+        if extension and not entry.name.endswith(extension):
+            continue
+        try:
+            entry.stat()
+        except OSError:
+            # Not cached; the caller's stat raises again and reports it.
+            pass
+        files.append(entry)
+    return files, subdirs
+
+
+def iter_damaged_files(
+    base_path: Path, extension: str, jobs: int = DEFAULT_JOBS
+) -> Iterator[os.DirEntry]:
+    """
+    Yield entries of files named *extension under base_path in the same top-down
+    order as os.walk, with their stat already cached.
+    The next directories in visiting order are listed ahead on a thread pool, so
+    per-directory read latency overlaps while the output order stays fixed.
+    """
+    max_pending = jobs * 2
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        # Directories still to visit, last one next; each holds its listing future once submitted.
+        stack: List[List] = [[str(base_path), None]]
+        pending = 0
+        while stack:
+            index = len(stack) - 1
+            while pending < max_pending and index >= 0:
+                entry = stack[index]
+                if entry[1] is None:
+                    entry[1] = executor.submit(scan_directory, entry[0], extension)
+                    pending += 1
+                index -= 1
+
+            _, future = stack.pop()
+            pending -= 1
+            files, subdirs = future.result()
+            yield from files
+            stack.extend([path, None] for path in reversed(subdirs))
+
+
+def truncate_file(path: str, stat_info: os.stat_result) -> None:
+    """Truncate path to zero bytes and restore its access and modification times."""
+    os.truncate(path, 0)
+    os.utime(path, ns=(stat_info.st_atime_ns, stat_info.st_mtime_ns))
 
 
 def process_damaged_files(
@@ -87,17 +136,50 @@ def process_damaged_files(
     extension: str,
     dry_run: bool,
     verbose: bool,
+    jobs: int = DEFAULT_JOBS,
 ) -> Tuple[int, int]:
     truncated = 0
     total_bytes = 0
-
-    for damaged_path in iter_damaged_files(base_path, extension):
-        ok, size = truncate_file(damaged_path, dry_run=dry_run, verbose=verbose)
-        if not ok:
-            continue
+    max_pending = jobs * 4
+    # Files in walk order: (path, size, truncate future), or no future in a dry run,
+    # or a stat warning.
+    pending: Deque[Tuple[str, int, Optional[Future], str]] = deque()
+
+    def finish(path: str, size: int, future: Optional[Future], warning: str) -> None:
+        nonlocal truncated, total_bytes
+        if warning:
+            eprint(warning)
+            return
+        if future is None:
+            print(f"[DRY RUN] {path} ({size} bytes)")
+        else:
+            try:
+                future.result()
+            except OSError as exc:
+                eprint(f"[error] Failed to truncate {path}: {exc}")
+                return
+            if verbose:
+                eprint(f"[info] Truncated {path} ({size} bytes)")
         truncated += 1
         total_bytes += size
 
+    # Truncation and utime run on the pool; messages and stats follow walk order.
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for entry in iter_damaged_files(base_path, extension, jobs):
+            path = entry.path
+            # The walk stat'ed the file already; this reads the entry's cached result.
+            try:
+                stat_info = entry.stat()
+            except OSError as exc:
+                pending.append((path, 0, None, f"[warn] Failed to stat {path}: {exc}"))
+            else:
+                future = None if dry_run else executor.submit(truncate_file, path, stat_info)
+                pending.append((path, stat_info.st_size, future, ""))
+            if len(pending) >= max_pending:
+                finish(*pending.popleft())
+        while pending:
+            finish(*pending.popleft())
+
     return truncated, total_bytes
 
 
@@ -107,12 +189,16 @@ def main() -> int:
     if not base_path.is_dir():
         eprint(f"Base path is not a directory: {base_path}")
         return 1
+    if args.jobs < 1:
+        eprint("Jobs must be a positive integer.")
+        return 1
 
     truncated, total_bytes = process_damaged_files(
         base_path=base_path,
         extension=args.extension,
         dry_run=args.dry_run,
         verbose=args.verbose,
+        jobs=args.jobs,
     )
 
     avg_bytes = (total_bytes / truncated) if truncated else 0.0
@@ -4,29 +4,75 @@ Validate recovered .doc files using multiple readers.
 
 Checks:
 - OLE container validation via olefile
-- Metadata parsing via hachoir
+- Summary property sets / Word FIB read from the same open container
+- Metadata parsing via hachoir (only with --hachoir)
+- Text extraction via textract (only with --deep)
+
+Files that are not OLE compound files are reported invalid without running the
+other checks. With --cache, results are stored per file content hash and files
+seen before are not parsed again.
 """
 from __future__ import annotations
 
 import argparse
 import contextlib
-import io
+import hashlib
+import json
 import logging
+import mmap
+import os
+import sqlite3
+import struct
 import sys
-from dataclasses import dataclass
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Callable, Iterable, List, Tuple
+from typing import BinaryIO, Iterable, Iterator, List, NamedTuple, Optional, Set, TextIO, Tuple
 
 import olefile
 from hachoir.metadata import extractMetadata
-from hachoir.parser import createParser
+from hachoir.parser.misc import OLE2_File
+from hachoir.stream import FileInputStream
 import textract
 
 DEBUG_MODE = False
-
-
-@dataclass
-class ValidationResult:
+# Set once a worker's stdout and stderr point at os.devnull; validators then skip
+# the per-call redirect, which remains for validation in the main process.
+_stdio_silenced = False
+_devnull: Optional[TextIO] = None
+_quiet_lock = threading.Lock()
+_quiet_depth = 0
+_saved_stdio: Tuple[TextIO, TextIO] = (sys.stdout, sys.stderr)
+_overlap_pool: Optional[ThreadPoolExecutor] = None
+NOT_OLE_DETAIL = "Not an OLE compound file"
+OLE_MAGIC = b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1"
+SUMMARY_STREAMS = ("\x05SummaryInformation", "\x05DocumentSummaryInformation")
+# MS-OLEPS property set stream: byte order, version, system id, clsid, set count,
+# then the first set's FMTID and offset.
+PROPERTY_SET_HEADER = struct.Struct("<HHI16sI16sI")
+# Property set: size and property count, then (id, offset) pairs.
+PROPERTY_SECTION_HEADER = struct.Struct("<II")
+PROPERTY_ENTRY = struct.Struct("<II")
+PROPERTY_TYPE = struct.Struct("<H")
+# Dictionary and code page entries carry no document metadata.
+IGNORED_PROPERTY_IDS = (0, 1)
+# Start of the Word FibBase: wIdent, nFib, unused, lid, pnNext, flags.
+FIB_BASE = struct.Struct("<HHHHHH")
+WORD_IDENT = 0xA5EC
+DEFAULT_JOBS = os.cpu_count() or 1
+# Files handed to a worker process at a time.
+VALIDATE_CHUNK_SIZE = 8
+HASH_CHUNK_SIZE = 1024 * 1024
+# Head of each upcoming file the kernel is asked to read ahead.
+PREFETCH_BYTES = 1024 * 1024
+HAVE_FADVISE = hasattr(os, "posix_fadvise")
+WRITE_BUFFER_SIZE = 64 * 1024
+# Bump when validator behaviour changes so stale cache entries stop matching.
+CACHE_VERSION = 2
+
+
+class ValidationResult(NamedTuple):
     name: str
     success: bool
     detail: str
@@ -85,88 +131,253 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Enable verbose logging from validators (e.g., hachoir warnings).",
     )
+    parser.add_argument(
+        "--hachoir",
+        action="store_true",
+        help="Also parse metadata with hachoir and require it to succeed (slow: "
+        "generic pure-Python parser).",
+    )
+    parser.add_argument(
+        "--deep",
+        action="store_true",
+        help="Also extract text with textract and require it to succeed (slow: "
+        "runs an external converter per file).",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help="Number of processes validating files in parallel.",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="DB",
+        help="SQLite file caching results by file content; files already validated "
+        "with identical content are not parsed again.",
+    )
+    parser.add_argument(
+        "--order",
+        choices=("walk", "inode"),
+        default="walk",
+        help="Order files are validated and reported in: directory walk order "
+        "(default) or by device and inode, which follows on-disk layout more "
+        "closely and cuts seeking on spinning disks.",
+    )
     return parser.parse_args()
 
 
-def iter_doc_files(base: Path, recursive: bool) -> Iterable[Path]:
-    pattern = "**/*.doc" if recursive else "*.doc"
-    yield from (p for p in base.glob(pattern) if p.is_file())
-
+def iter_doc_files(base: Path, recursive: bool) -> Iterable[str]:
+    """
+    Yield the .doc files under base in the order Path.glob("**/*.doc") does: each
+    directory's matches, then its subdirectories, symlinked directories not walked.
+    One scandir per directory; file types come from the entries' cached d_type.
+    Paths stay plain strings: no Path is built, re-stringified or pickled per file.
+    """
+    stack = [str(base)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as iterator:
+                entries = list(iterator)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        subdirs.append(entry.path)
+                # Follows symlinks like Path.is_file; only links cost a stat.
+                elif entry.name.endswith(".doc") and entry.is_file():
+                    yield entry.path
+            except OSError:
+                continue
+        stack.extend(reversed(subdirs))
+
+
+@contextlib.contextmanager
+def quiet_output() -> Iterator[None]:
+    """
+    Discard what the validators print unless --debug is set. Safe to nest across
+    threads: stdout and stderr are swapped on the first entry, restored on the last.
+    """
+    global _devnull, _quiet_depth, _saved_stdio
+    if DEBUG_MODE or _stdio_silenced:
+        yield
+        return
+    with _quiet_lock:
+        if _quiet_depth == 0:
+            if _devnull is None:
+                _devnull = open(os.devnull, "w")
+            _saved_stdio = (sys.stdout, sys.stderr)
+            sys.stdout = sys.stderr = _devnull
+        _quiet_depth += 1
+    try:
+        yield
+    finally:
+        with _quiet_lock:
+            _quiet_depth -= 1
+            if _quiet_depth == 0:
+                sys.stdout, sys.stderr = _saved_stdio
+
+
+def overlap_pool() -> ThreadPoolExecutor:
+    """This process's thread for running textract alongside the in-process checks."""
+    global _overlap_pool
+    if _overlap_pool is None:
+        _overlap_pool = ThreadPoolExecutor(max_workers=1)
+    return _overlap_pool
+
+
+def silence_stdio() -> None:
+    """Point this process's stdout and stderr at os.devnull, for worker processes."""
+    global _stdio_silenced
+    sys.stdout.flush()
+    sys.stderr.flush()
+    null_fd = os.open(os.devnull, os.O_WRONLY)
+    try:
+        os.dup2(null_fd, sys.stdout.fileno())
+        os.dup2(null_fd, sys.stderr.fileno())
+    finally:
+        os.close(null_fd)
+    _stdio_silenced = True
+
+
+def map_file(handle: BinaryIO) -> BinaryIO:
+    """
+    A read-only mapping of handle's file, usable as a file object; handle itself
+    (rewound) if the file cannot be mapped, e.g. because it is empty.
+    """
+    try:
+        return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        handle.seek(0)
+        return handle
 
-def validate_with_olefile(path: Path) -> ValidationResult:
-    if not olefile.isOleFile(str(path)):
-        return ValidationResult("olefile", False, "Not an OLE compound file")
 
+def validate_with_olefile(source: BinaryIO) -> Tuple[List[ValidationResult], Optional[bool]]:
+    """
+    Open the container with olefile and read its metadata from the same source.
+    Also reports whether it has a WordDocument stream; None if it could not be read.
+    """
     try:
-        with olefile.OleFileIO(str(path)) as ole:
+        if source.read(len(OLE_MAGIC)) != OLE_MAGIC:
+            return [ValidationResult("olefile", False, NOT_OLE_DETAIL)], None
+        source.seek(0)
+        with olefile.OleFileIO(source) as ole:
             streams = ole.listdir()
             if not streams:
-                return ValidationResult("olefile", False, "OLE container has no streams")
+                ole_result = ValidationResult("olefile", False, "OLE container has no streams")
             # Summary streams indicate structured Word content
-            if ole.exists("\x05SummaryInformation") or ole.exists("\x05DocumentSummaryInformation"):
-                return ValidationResult("olefile", True, "OLE opened; summary info present")
-            return ValidationResult("olefile", True, "OLE opened; streams present")
+            elif any(ole.exists(name) for name in SUMMARY_STREAMS):
+                ole_result = ValidationResult("olefile", True, "OLE opened; summary info present")
+            else:
+                ole_result = ValidationResult("olefile", True, "OLE opened; streams present")
+            return [ole_result, validate_properties(ole)], ole.exists("WordDocument")
     except Exception as exc:
-        return ValidationResult("olefile", False, f"OleFile error: {exc}")
+        return [ValidationResult("olefile", False, f"OleFile error: {exc}")], None
+
+
+def count_properties(data: bytes) -> int:
+    """Count the typed document properties in the first set of a property set stream."""
+    byte_order, _, _, _, set_count, _, offset = PROPERTY_SET_HEADER.unpack_from(data)
+    if byte_order != 0xFFFE or set_count < 1:
+        raise ValueError("bad property set header")
+    size, count = PROPERTY_SECTION_HEADER.unpack_from(data, offset)
+    end = min(offset + size, len(data))
+    first_entry = offset + PROPERTY_SECTION_HEADER.size
+    if first_entry + count * PROPERTY_ENTRY.size > end:
+        raise ValueError("property list exceeds its set")
+    found = 0
+    for prop_id, prop_offset in PROPERTY_ENTRY.iter_unpack(
+        data[first_entry : first_entry + count * PROPERTY_ENTRY.size]
+    ):
+        start = offset + prop_offset
+        if prop_id in IGNORED_PROPERTY_IDS or start + PROPERTY_TYPE.size > end:
+            continue
+        # VT_EMPTY holds no value.
+        if PROPERTY_TYPE.unpack_from(data, start)[0] != 0:
+            found += 1
+    return found
+
+
+def read_fib_base(ole: olefile.OleFileIO) -> bytes:
+    """Read the FibBase at the start of the WordDocument stream, b"" if absent."""
+    entry = next((kid for kid in ole.root.kids if kid.name == "WordDocument"), None)
+    if entry is None or entry.size < FIB_BASE.size:
+        return b""
+    if entry.size < ole.minisectorcutoff:
+        with ole.openstream("WordDocument") as stream:
+            return stream.read(FIB_BASE.size)
+    # openstream would load the whole document; the FIB is in its first sector.
+    offset = (entry.isectStart + 1) * ole.sectorsize
+    # A truncated file may end before it; a mapping cannot seek past its end.
+    ole.fp.seek(0, os.SEEK_END)
+    if offset >= ole.fp.tell():
+        return b""
+    ole.fp.seek(offset)
+    return ole.fp.read(FIB_BASE.size)
+
+
+def validate_properties(ole: olefile.OleFileIO) -> ValidationResult:
+    """
+    Look for typed summary properties, or else a Word FIB, read directly from the
+    container olefile already parsed. This is looser than hachoir: a summary-only
+    container without a WordDocument stream passes here but not there.
+    """
+    for name in SUMMARY_STREAMS:
+        if not ole.exists(name):
+            continue
+        try:
+            with ole.openstream(name) as stream:
+                if count_properties(stream.read()):
+                    return ValidationResult("properties", True, "Summary properties read")
+        except (struct.error, ValueError, OSError):
+            continue
 
+    try:
+        fib = read_fib_base(ole)
+    except (struct.error, ValueError, OSError) as exc:
+        return ValidationResult("properties", False, f"WordDocument read failed: {exc}")
+    if len(fib) == FIB_BASE.size and FIB_BASE.unpack(fib)[0] == WORD_IDENT:
+        return ValidationResult("properties", True, "Word FIB read")
+    return ValidationResult("properties", False, "No metadata found")
 
-def validate_with_hachoir(path: Path) -> ValidationResult:
-    stdout_buffer = io.StringIO()
-    stderr_buffer = io.StringIO()
-    redirects = []
-    if not DEBUG_MODE:
-        redirects = [
-            contextlib.redirect_stdout(stdout_buffer),
-            contextlib.redirect_stderr(stderr_buffer),
-        ]
 
+def validate_with_hachoir(source: BinaryIO) -> ValidationResult:
+    """Parse metadata with hachoir; source is closed along with the parser."""
     try:
-        with contextlib.ExitStack() as stack:
-            for redirect in redirects:
-                stack.enter_context(redirect)
-            parser = createParser(str(path))
+        stream = FileInputStream(source)
     except Exception as exc:
+        source.close()
         return ValidationResult("hachoir", False, f"Parser creation failed: {exc}")
 
-    if not parser:
-        return ValidationResult("hachoir", False, "Unable to create parser")
+    # The file already passed olefile, so hachoir's OLE2 parser is used directly
+    # instead of createParser probing its whole registry when validation fails.
+    with quiet_output():
+        try:
+            parser = OLE2_File(stream, validate=True)
+        except Exception:
+            stream.close()
+            return ValidationResult("hachoir", False, "Unable to create parser")
 
-    try:
-        with contextlib.ExitStack() as stack:
-            for redirect in redirects:
-                stack.enter_context(redirect)
+        try:
             with parser:
                 metadata = extractMetadata(parser)
-    except Exception as exc:
-        return ValidationResult("hachoir", False, f"Metadata extraction failed: {exc}")
+        except Exception as exc:
+            return ValidationResult("hachoir", False, f"Metadata extraction failed: {exc}")
 
+    # Metadata is truthy only when an item holds a value, which is also when
+    # exportPlaintext() has lines, so nothing needs to be formatted.
     if not metadata:
         return ValidationResult("hachoir", False, "No metadata extracted")
+    return ValidationResult("hachoir", True, "Metadata extracted")
 
-    try:
-        exported = list(metadata.exportPlaintext() or [])
-    except Exception:
-        exported = []
-
-    detail = "Metadata extracted" if exported else "Metadata object returned"
-    return ValidationResult("hachoir", True, detail)
-
-
-def validate_with_textract(path: Path) -> ValidationResult:
-    stdout_buffer = io.StringIO()
-    stderr_buffer = io.StringIO()
-    redirects = []
-    if not DEBUG_MODE:
-        redirects = [
-            contextlib.redirect_stdout(stdout_buffer),
-            contextlib.redirect_stderr(stderr_buffer),
-        ]
 
+def validate_with_textract(path: str) -> ValidationResult:
     try:
-        with contextlib.ExitStack() as stack:
-            for redirect in redirects:
-                stack.enter_context(redirect)
-            text = textract.process(str(path))
+        with quiet_output():
+            text = textract.process(path)
     except Exception as exc:
         return ValidationResult("textract", False, f"Text extraction failed: {exc}")
 
@@ -179,23 +390,48 @@ def validate_with_textract(path: Path) -> ValidationResult:
     return ValidationResult("textract", False, "Empty text extracted")
 
 
-VALIDATORS: List[Callable[[Path], ValidationResult]] = [
-    validate_with_olefile,
-    validate_with_hachoir,
-    validate_with_textract,
-]
-
-
-def validate_file(path: Path) -> Tuple[bool, List[ValidationResult]]:
-    results = [validator(path) for validator in VALIDATORS]
-    valid = any(r.success for r in results)
-    textract_results = [r for r in results if r.name == "textract"]
-    if textract_results:
-        # If text extraction fails, consider the file invalid to catch documents
-        # that open structurally but are unreadable.
-        if not any(r.success for r in textract_results):
-            valid = False
-    return valid, results
+def validate_file(
+    path: str, deep: bool = False, hachoir: bool = False
+) -> Tuple[bool, List[ValidationResult]]:
+    try:
+        handle = open(path, "rb")
+    except OSError as exc:
+        return False, [ValidationResult("olefile", False, f"OleFile error: {exc}")]
+
+    # The file is opened once. olefile and hachoir each read through their own
+    # mapping of it, sharing its cached pages instead of issuing a read per sector.
+    with handle:
+        view = map_file(handle)
+        try:
+            results, has_word = validate_with_olefile(view)
+        finally:
+            if view is not handle:
+                view.close()
+        ole_result = results[0]
+        if not ole_result.success and ole_result.detail == NOT_OLE_DETAIL:
+            # Neither hachoir nor the .doc text converters read a non-OLE file.
+            return False, results
+
+        # Without a WordDocument stream there is no Word text for textract to find,
+        # so its converter is not started.
+        skip_textract = deep and has_word is False
+        # textract mostly waits on its converter subprocess, so it runs on a thread
+        # while hachoir parses in this one.
+        textract_future = None
+        if deep and not skip_textract:
+            textract_future = overlap_pool().submit(validate_with_textract, path)
+        if hachoir:
+            results.append(validate_with_hachoir(map_file(handle)))
+    if skip_textract:
+        textract_result = ValidationResult("textract", False, "Skipped: no WordDocument stream")
+    elif textract_future is None:
+        return all(result.success for result in results), results
+    else:
+        textract_result = textract_future.result()
+    results.append(textract_result)
+    # If text extraction fails, consider the file invalid to catch documents
+    # that open structurally but are unreadable.
+    return textract_result.success, results
 
 
 def configure_hachoir_logging(debug: bool) -> None:
@@ -220,6 +456,196 @@ def configure_hachoir_logging(debug: bool) -> None:
             logger.addHandler(logging.NullHandler())
 
 
+class ValidationCache:
+    """Validation results stored in SQLite, keyed by content hash and mode."""
+
+    def __init__(self, path: Path) -> None:
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS validation "
+            "(key TEXT PRIMARY KEY, valid INTEGER NOT NULL, results TEXT NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[Tuple[bool, List[ValidationResult]]]:
+        row = self.conn.execute(
+            "SELECT valid, results FROM validation WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        results = [
+            ValidationResult(name, success, detail)
+            for name, success, detail in json.loads(row[1])
+        ]
+        return bool(row[0]), results
+
+    def put(self, key: str, valid: bool, results: List[ValidationResult]) -> None:
+        encoded = json.dumps([[r.name, r.success, r.detail] for r in results])
+        self.conn.execute(
+            "INSERT OR REPLACE INTO validation (key, valid, results) VALUES (?, ?, ?)",
+            (key, int(valid), encoded),
+        )
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+
+def content_key(path: str, deep: bool, hachoir: bool) -> Optional[str]:
+    """Cache key for path: its SHA-256 plus the validation mode; None if unreadable."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    mode = ("deep" if deep else "fast") + ("+hachoir" if hachoir else "")
+    return f"{CACHE_VERSION}:{mode}:{digest.hexdigest()}"
+
+
+def init_worker(debug: bool) -> None:
+    """Worker process initializer: apply the main process's debug settings."""
+    global DEBUG_MODE
+    DEBUG_MODE = debug
+    configure_hachoir_logging(debug)
+    if not debug:
+        # Results go back to the main process; nothing a worker prints is shown.
+        silence_stdio()
+
+
+def has_ole_magic(path: str) -> bool:
+    """True if path starts with the OLE signature, or cannot be read and needs a full report."""
+    try:
+        with open(path, "rb") as handle:
+            return handle.read(len(OLE_MAGIC)) == OLE_MAGIC
+    except OSError:
+        return True
+
+
+def iter_validations(
+    files: List[str],
+    jobs: int,
+    debug: bool,
+    deep: bool,
+    hachoir: bool,
+    cache: Optional[ValidationCache] = None,
+) -> Iterable[Tuple[bool, List[ValidationResult]]]:
+    """
+    Yield validation results in file order. Files without the OLE signature are
+    answered here, without hashing them or handing them to a worker.
+    """
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        is_ole = list(executor.map(has_ole_magic, files))
+    candidates = [path for path, ole in zip(files, is_ole) if ole]
+    checked = validate_candidates(candidates, jobs, debug, deep, hachoir, cache)
+    for ole in is_ole:
+        if ole:
+            yield next(checked)
+        else:
+            yield False, [ValidationResult("olefile", False, NOT_OLE_DETAIL)]
+
+
+def validate_candidates(
+    files: List[str],
+    jobs: int,
+    debug: bool,
+    deep: bool,
+    hachoir: bool,
+    cache: Optional[ValidationCache],
+) -> Iterable[Tuple[bool, List[ValidationResult]]]:
+    """
+    Yield validation results in file order. With a cache, files whose content was
+    validated before, in an earlier run or earlier in this one, are answered from
+    it and only the rest are validated.
+    """
+    if cache is None:
+        yield from run_validations(files, jobs, debug, deep, hachoir)
+        return
+
+    # Hashing is I/O plus hashlib, which releases the GIL, so threads suffice.
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        keys = list(executor.map(partial(content_key, deep=deep, hachoir=hachoir), files))
+    cached = [cache.get(key) if key is not None else None for key in keys]
+    # Carvers often recover the same content many times; each distinct content is
+    # validated once and its copies read the result stored for the first one.
+    misses: List[str] = []
+    queued: Set[str] = set()
+    copies: Set[str] = set()
+    for path, key, hit in zip(files, keys, cached):
+        if hit is not None:
+            continue
+        if key is None:
+            misses.append(path)
+        elif key in queued:
+            copies.add(key)
+        else:
+            queued.add(key)
+            misses.append(path)
+    fresh = run_validations(misses, jobs, debug, deep, hachoir)
+    for key, hit in zip(keys, cached):
+        if hit is None and key in copies:
+            # None for the first copy, which is stored below before the others come up.
+            hit = cache.get(key)
+        if hit is None:
+            hit = next(fresh)
+            if key is not None:
+                cache.put(key, *hit)
+        yield hit
+
+
+def prefetch_head(path: str) -> None:
+    """Start kernel read-ahead of the head of path without waiting for it."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, PREFETCH_BYTES, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def with_prefetch(
+    files: List[str],
+    results: Iterable[Tuple[bool, List[ValidationResult]]],
+    ahead: int,
+) -> Iterable[Tuple[bool, List[ValidationResult]]]:
+    """Pass results through, starting read-ahead of the file `ahead` places on per result."""
+    if not HAVE_FADVISE:
+        yield from results
+        return
+    for index, result in enumerate(results):
+        if index + ahead < len(files):
+            prefetch_head(files[index + ahead])
+        yield result
+
+
+def run_validations(
+    files: List[str], jobs: int, debug: bool, deep: bool, hachoir: bool
+) -> Iterable[Tuple[bool, List[ValidationResult]]]:
+    """
+    Yield validate_file results in file order. The validators parse in pure Python
+    and textract runs an external converter per file, so with more than one job
+    files are validated in worker processes.
+    """
+    validate = partial(validate_file, deep=deep, hachoir=hachoir)
+    # Workers may run up to jobs chunks past the result being yielded.
+    ahead = jobs * VALIDATE_CHUNK_SIZE * 2
+    if HAVE_FADVISE:
+        for path in files[:ahead]:
+            prefetch_head(path)
+    if jobs == 1 or len(files) <= 1:
+        yield from with_prefetch(files, map(validate, files), ahead)
+        return
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=init_worker, initargs=(debug,)
+    ) as executor:
+        results = executor.map(validate, files, chunksize=VALIDATE_CHUNK_SIZE)
+        yield from with_prefetch(files, results, ahead)
+
+
 def main() -> int:
     args = parse_args()
     global DEBUG_MODE
@@ -229,38 +655,98 @@ def main() -> int:
     if not base.exists() or not base.is_dir():
         print(f"Input directory does not exist or is not a directory: {base}", file=sys.stderr)
         return 1
+    if args.jobs < 1:
+        print("--jobs must be at least 1", file=sys.stderr)
+        return 1
+
+    cache: Optional[ValidationCache] = None
+    if args.cache:
+        try:
+            cache = ValidationCache(Path(args.cache).expanduser())
+        except sqlite3.Error as exc:
+            print(f"Failed to open cache {args.cache}: {exc}", file=sys.stderr)
+            return 1
 
+    try:
+        return report(args, base, cache)
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def inode_key(path: str) -> Tuple[int, int]:
+    """(device, inode) of path for --order inode; unreadable files sort first."""
+    try:
+        info = os.stat(path)
+    except OSError:
+        return 0, 0
+    return info.st_dev, info.st_ino
+
+
+def report(args: argparse.Namespace, base: Path, cache: Optional[ValidationCache]) -> int:
     files = list(iter_doc_files(base, args.recursive))
+    if args.order == "inode":
+        with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+            keys = list(executor.map(inode_key, files))
+        files = [path for _, path in sorted(zip(keys, files))]
     total = len(files)
     valid_count = 0
     invalid_count = 0
 
-    for path in files:
-        is_valid, results = validate_file(path)
-        if is_valid:
-            valid_count += 1
-        else:
-            invalid_count += 1
-
-        if args.only_valid:
+    # Redirected output is joined and written in WRITE_BUFFER_SIZE batches; a
+    # terminal still gets each line as its file is done.
+    interactive = sys.stdout.isatty()
+    pending: List[str] = []
+    pending_size = 0
+
+    def flush() -> None:
+        nonlocal pending_size
+        if pending:
+            sys.stdout.write("".join(pending))
+            pending.clear()
+            pending_size = 0
+
+    def emit(line: str) -> None:
+        nonlocal pending_size
+        if interactive:
+            print(line)
+            return
+        pending.append(f"{line}\n")
+        pending_size += len(line) + 1
+        if pending_size >= WRITE_BUFFER_SIZE:
+            flush()
+
+    validations = iter_validations(
+        files, args.jobs, args.debug, args.deep, args.hachoir, cache
+    )
+    try:
+        for path, (is_valid, results) in zip(files, validations):
             if is_valid:
-                print(path)
-            continue
-
-        if args.only_invalid:
-            if not is_valid:
-                print(path)
-            continue
-
-        if args.quiet and is_valid:
-            continue
-
-        status = "VALID" if is_valid else "INVALID"
-        if args.verbose:
-            details = "; ".join(f"{r.name}: {r.detail}" for r in results)
-            print(f"{status}: {path} ({details})")
-        else:
-            print(f"{status}: {path}")
+                valid_count += 1
+            else:
+                invalid_count += 1
+
+            if args.only_valid:
+                if is_valid:
+                    emit(path)
+                continue
+
+            if args.only_invalid:
+                if not is_valid:
+                    emit(path)
+                continue
+
+            if args.quiet and is_valid:
+                continue
+
+            status = "VALID" if is_valid else "INVALID"
+            if args.verbose:
+                details = "; ".join(f"{r.name}: {r.detail}" for r in results)
+                emit(f"{status}: {path} ({details})")
+            else:
+                emit(f"{status}: {path}")
+    finally:
+        flush()
 
     if args.summary:
         print(f"Processed: {total}, valid: {valid_count}, invalid: {invalid_count}")